@@ -0,0 +1,5 @@
+import sys
+
+from Engine.cli import main
+
+sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Mergeable column accumulators
+
+A file that does not fit in memory is profiled chunk by chunk: every chunk is folded into one
+accumulator per column and accumulators of different chunks can be merged. The result is the
+same DatasetProfile that an in-memory dataframe produces, so the sections can show either one.
+"""
+import numpy as np
+from pandas.api import types as ptypes
+
+from Engine.profile import (
+    QUANTILES,
+    ColumnProfile,
+    DatasetProfile,
+    count_zeros,
+    sorted_values,
+    value_counts,
+)
+from Engine.sketches import DistinctCounter, QuantileSketch
+
+
+def _common_dtype(left, right):
+    """
+    The type that a column gets when chunks with these two types are read at once
+    """
+    if left is None or left == right:
+        return right
+    if right is None:
+        return left
+    numeric = [
+        ptypes.is_numeric_dtype(dtype) and not ptypes.is_bool_dtype(dtype)
+        for dtype in (left, right)
+    ]
+    if all(numeric):
+        return np.result_type(left, right)
+    return np.dtype("object")
+
+
+class ColumnAccumulator:
+    """
+    Running statistics of one column: row, missing and zero counts, a distinct value sketch,
+    and the min, max, mean, variance and a quantile sketch of numerical values
+    """
+
+    def __init__(self, name, max_exact=4096, error=0.01):
+        self.name = name
+        self.dtype = None
+        self.n_rows = 0
+        self.n_missing = 0
+        self.n_zero = 0
+        self.distinct = DistinctCounter(max_exact=max_exact, error=error)
+
+        # numerical statistics, the variance is merged with Chan's parallel algorithm
+        self.n_numeric = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.quantiles = QuantileSketch(max_exact=max_exact)
+
+    def update(self, series):
+        """
+        Fold one chunk of the column into the accumulator
+        """
+        counts = value_counts(series)
+        n_present = int(counts.sum())
+
+        chunk = ColumnAccumulator(
+            self.name, max_exact=self.distinct.max_exact, error=self.distinct.error
+        )
+        chunk.dtype = series.dtype
+        chunk.n_rows = len(series)
+        chunk.n_missing = chunk.n_rows - n_present
+        chunk.n_zero = count_zeros(series, counts)
+        chunk.distinct.add(counts.index)
+
+        if (
+            ptypes.is_numeric_dtype(series.dtype)
+            and not ptypes.is_bool_dtype(series.dtype)
+            and n_present > 0
+        ):
+            values, weights = sorted_values(counts)
+            chunk.n_numeric = n_present
+            chunk.min = values[0]
+            chunk.max = values[-1]
+            chunk.mean = (values * weights).sum() / n_present
+            chunk.m2 = ((values - chunk.mean) ** 2 * weights).sum()
+            chunk.quantiles.add(values, weights)
+
+        return self.merge(chunk)
+
+    def add_missing(self, n_rows):
+        """
+        Count rows in which the column does not occur, e.g. chunks or files without the column, as missing
+        """
+        self.n_rows += n_rows
+        self.n_missing += n_rows
+        return self
+
+    def merge(self, other):
+        """
+        Merge the accumulator of another chunk of the same column into this one
+        """
+        self.dtype = _common_dtype(self.dtype, other.dtype)
+        self.n_rows += other.n_rows
+        self.n_missing += other.n_missing
+        self.n_zero += other.n_zero
+        self.distinct.merge(other.distinct)
+        self.quantiles.merge(other.quantiles)
+
+        n_total = self.n_numeric + other.n_numeric
+        if other.n_numeric > 0:
+            delta = other.mean - self.mean
+            self.mean += delta * other.n_numeric / n_total
+            self.m2 += other.m2 + delta ** 2 * self.n_numeric * other.n_numeric / n_total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.n_numeric = n_total
+        return self
+
+    def to_profile(self):
+        """
+        :return: a ColumnProfile, the quantiles are exact for columns with few distinct values
+        and estimated with a KLL sketch otherwise, see sketches.QuantileSketch
+        """
+        profile = ColumnProfile(
+            name=self.name,
+            dtype=self.dtype,
+            n_rows=self.n_rows,
+            n_missing=self.n_missing,
+            # an estimate can exceed the number of values, as in the in-memory approximate profile
+            n_unique=min(self.distinct.count(), self.n_rows - self.n_missing),
+            n_zero=self.n_zero,
+            n_unique_exact=self.distinct.is_exact,
+            distinct=self.distinct,
+        )
+        if profile.is_numeric and self.n_numeric > 0:
+            profile.min = float(self.min)
+            profile.max = float(self.max)
+            profile.mean = float(self.mean)
+            if self.n_numeric > 1:
+                profile.std = float(np.sqrt(self.m2 / (self.n_numeric - 1)))
+            else:
+                profile.std = np.nan
+            profile.quantiles = {q: self.quantiles.quantile(q) for q in QUANTILES}
+            profile.quantiles_exact = self.quantiles.is_exact
+        return profile
+
+
+class DatasetAccumulator:
+    """
+    One ColumnAccumulator per column, fed with dataframe chunks
+    """
+
+    def __init__(self, max_exact=4096, error=0.01):
+        self.max_exact = max_exact
+        self.error = error
+        self.columns = {}
+        self.n_rows = 0
+
+    def update(self, chunk):
+        """
+        Fold a dataframe chunk into the accumulators, columns are matched by name.
+        The rows of a column that is missing from some chunks count as missing values in those chunks
+        """
+        for name in chunk.columns:
+            if name not in self.columns:
+                self.columns[name] = ColumnAccumulator(
+                    name, self.max_exact, self.error
+                ).add_missing(self.n_rows)
+            self.columns[name].update(chunk[name])
+        for name, column in self.columns.items():
+            if name not in chunk.columns:
+                column.add_missing(len(chunk))
+        self.n_rows += len(chunk)
+        return self
+
+    def merge(self, other):
+        for name, column in self.columns.items():
+            if name not in other.columns:
+                column.add_missing(other.n_rows)
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column.add_missing(self.n_rows)
+        self.n_rows += other.n_rows
+        return self
+
+    def to_profile(self):
+        return DatasetProfile(
+            [column.to_profile() for column in self.columns.values()],
+            n_rows=self.n_rows,
+        )
+
+
+def profile_chunks(chunks, preview_rows=100, max_exact=4096, error=0.01):
+    """
+    :param chunks: an iterable of dataframe chunks, e.g. pd.read_csv(..., chunksize=...)
+    :param preview_rows: the number of leading rows to keep for display
+    :param max_exact: unique values are counted exactly up to this number, see sketches.DistinctCounter
+    :param error: the relative error of the unique values above max_exact
+    :return: the DatasetProfile of all chunks and a dataframe with the first rows
+
+    Only one chunk is held in memory at a time.
+    """
+    accumulator = DatasetAccumulator(max_exact=max_exact, error=error)
+    preview = None
+    for chunk in chunks:
+        if preview is None:
+            preview = chunk.head(preview_rows).copy()
+        accumulator.update(chunk)
+    return accumulator.to_profile(), preview
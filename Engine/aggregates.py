@@ -0,0 +1,252 @@
+"""
+Aggregates for the visualizations
+
+The plots are drawn from small aggregates instead of the rows: histogram bins with a density curve,
+five-number summaries per group, counts per category and, for large scatterplots, point counts on a
+grid. Computing them takes a few vectorised passes over the data, drawing them only depends on the
+number of bins, groups and categories.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# seaborn's distplot uses the Freedman-Diaconis number of bins, with at most this many
+MAX_BINS = 50
+
+# the density curve is estimated on this many grid points
+DENSITY_GRID = 512
+
+# boxplots draw at most this many outliers per group, the most extreme ones are always drawn
+MAX_FLIERS = 500
+
+# scatterplots of more points are drawn as a density raster of a fixed size
+RASTER_MIN_POINTS = 200_000
+
+
+@dataclass
+class Histogram:
+    """
+    Bin edges and counts, and a density curve evaluated on a grid
+    """
+
+    edges: np.ndarray
+    counts: np.ndarray
+    grid: np.ndarray
+    density: np.ndarray
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    @property
+    def bin_density(self):
+        """
+        The counts scaled to a density, so that the bars and the curve share an axis
+        """
+        return self.counts / (self.n * np.diff(self.edges))
+
+
+def _bins(values):
+    """
+    The Freedman-Diaconis number of bins, as seaborn's distplot chooses it
+    """
+    if len(values) < 2:
+        return 1
+    q1, q3 = np.percentile(values, [25, 75])
+    width = 2 * (q3 - q1) / len(values) ** (1 / 3)
+    if width == 0:
+        return min(MAX_BINS, int(np.sqrt(len(values))))
+    return int(min(MAX_BINS, max(1, np.ceil((values.max() - values.min()) / width))))
+
+
+def _density(values, grid_size=DENSITY_GRID):
+    """
+    Gaussian kernel density with Scott's bandwidth, estimated on a binned grid:
+    the values are counted in grid_size bins and the counts are convolved with the kernel,
+    which takes O(n + grid_size ** 2) instead of O(n * grid_size)
+    """
+    n = len(values)
+    bandwidth = values.std(ddof=1) * n ** (-1 / 5) if n > 1 else 0.0
+    if not bandwidth > 0:
+        return np.array([values.min() if n else 0.0]), np.array([0.0])
+
+    low = values.min() - 3 * bandwidth
+    high = values.max() + 3 * bandwidth
+    counts, edges = np.histogram(values, bins=grid_size, range=(low, high))
+    grid = (edges[:-1] + edges[1:]) / 2
+    step = edges[1] - edges[0]
+
+    offsets = np.arange(-grid_size + 1, grid_size) * step / bandwidth
+    kernel = np.exp(-0.5 * offsets ** 2) / (np.sqrt(2 * np.pi) * bandwidth)
+    # the part of the full convolution that is centred on the grid points
+    density = np.convolve(counts, kernel)[grid_size - 1 : 2 * grid_size - 1] / n
+    return grid, density
+
+
+def histogram(series, bins=None):
+    """
+    :param series: a numerical column, missing values are left out
+    :param bins: the number of bins, None chooses them as seaborn's distplot does
+    :return: a Histogram with the counts per bin and the density curve
+    """
+    values = series.dropna().to_numpy(dtype="float64")
+    if bins is None:
+        bins = _bins(values)
+    counts, edges = np.histogram(values, bins=bins)
+    grid, density = _density(values) if len(values) else (np.empty(0), np.empty(0))
+    return Histogram(edges=edges, counts=counts, grid=grid, density=density)
+
+
+def _five_numbers(values, label, whis=1.5, max_fliers=MAX_FLIERS):
+    """
+    :param values: the sorted values of one group
+    :return: the statistics of one box in the format of matplotlib's Axes.bxp
+    """
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    low = values[np.searchsorted(values, q1 - whis * iqr, side="left")]
+    high = values[np.searchsorted(values, q3 + whis * iqr, side="right") - 1]
+    fliers = np.concatenate([values[values < low], values[values > high]])
+    if len(fliers) > max_fliers:
+        # evenly spaced over the sorted outliers, so the extremes are kept
+        fliers = np.sort(fliers)[np.linspace(0, len(fliers) - 1, max_fliers).astype("int64")]
+    return {
+        "label": label,
+        "med": median,
+        "q1": q1,
+        "q3": q3,
+        "whislo": low,
+        "whishi": high,
+        "fliers": fliers,
+        "n": len(values),
+    }
+
+
+def _empty_box(label):
+    """
+    :return: the statistics of a group without values, which keeps its position and color but draws no box
+    """
+    return {
+        "label": label,
+        "med": np.nan,
+        "q1": np.nan,
+        "q3": np.nan,
+        "whislo": np.nan,
+        "whishi": np.nan,
+        "fliers": np.empty(0),
+        "n": 0,
+    }
+
+
+def box_stats(values, groups, order=None):
+    """
+    :param values: a numerical column
+    :param groups: the grouping column, missing groups and values are left out as seaborn does
+    :param order: the groups to show, None shows the groups in the order of category_order
+    :return: a list with the five-number summary of every group in order, see matplotlib's Axes.bxp.
+    Groups without values get an empty box, as seaborn leaves their place empty
+    """
+    frame = pd.DataFrame({"value": values.to_numpy(), "group": groups.to_numpy()}).dropna()
+    if order is None:
+        order = category_order(groups)
+    codes = pd.Categorical(frame["group"], categories=order).codes
+    numbers = frame["value"].to_numpy(dtype="float64")
+
+    # one sort by group and value, after which every group is a sorted slice
+    sorted_positions = np.lexsort((numbers, codes))
+    codes, numbers = codes[sorted_positions], numbers[sorted_positions]
+    bounds = np.searchsorted(codes, np.arange(len(order) + 1))
+
+    stats = []
+    for code, label in enumerate(order):
+        group_values = numbers[bounds[code] : bounds[code + 1]]
+        stats.append(_five_numbers(group_values, label) if len(group_values) else _empty_box(label))
+    return stats
+
+
+def category_order(series):
+    """
+    The order of seaborn's categorical plots: the categories of a categorical column,
+    otherwise the values in order of their first appearance
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return list(series.cat.categories)
+    return list(pd.unique(series.dropna()))
+
+
+def category_counts(series):
+    """
+    :return: the number of rows of every category, in the order of category_order
+    """
+    counts = series.value_counts(sort=False, dropna=True)
+    return counts.reindex(category_order(series), fill_value=0)
+
+
+@dataclass
+class DensityRaster:
+    """
+    The number of points per cell of a fixed grid, for every category
+
+    counts has the shape (categories, rows, columns), the first row is at the bottom of the plot.
+    """
+
+    counts: np.ndarray
+    extent: tuple
+    categories: list
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+
+def _edges(values, bins):
+    low, high = values.min(), values.max()
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return low, high, (high - low) / bins
+
+
+def _cells(values, low, width, bins):
+    return np.minimum(((values - low) / width).astype("int64"), bins - 1)
+
+
+def density_raster(x, y, hue=None, shape=(300, 400)):
+    """
+    :param x: the numerical column on the horizontal axis
+    :param y: the numerical column on the vertical axis
+    :param hue: a categorical column that colours the points, None for a single colour
+    :param shape: the number of rows and columns of the grid
+    :return: a DensityRaster, rows with a missing value are left out as seaborn does
+    """
+    columns = {"x": x.to_numpy(), "y": y.to_numpy()}
+    if hue is not None:
+        columns["hue"] = hue.to_numpy()
+    frame = pd.DataFrame(columns).dropna()
+    categories = category_order(hue) if hue is not None else [None]
+    n_rows, n_columns = shape
+    if len(frame) == 0:
+        return DensityRaster(np.zeros((len(categories), n_rows, n_columns)), (0, 1, 0, 1), categories)
+
+    x_values = frame["x"].to_numpy(dtype="float64")
+    y_values = frame["y"].to_numpy(dtype="float64")
+    x_low, x_high, x_width = _edges(x_values, n_columns)
+    y_low, y_high, y_width = _edges(y_values, n_rows)
+    codes = (
+        pd.Categorical(frame["hue"], categories=categories).codes.astype("int64")
+        if hue is not None
+        else np.zeros(len(frame), dtype="int64")
+    )
+
+    # one bincount over the cells of all categories at once
+    cells = (
+        codes * n_rows * n_columns
+        + _cells(y_values, y_low, y_width, n_rows) * n_columns
+        + _cells(x_values, x_low, x_width, n_columns)
+    )
+    counts = np.bincount(cells[codes >= 0], minlength=len(categories) * n_rows * n_columns)
+    return DensityRaster(
+        counts.reshape(len(categories), n_rows, n_columns),
+        (x_low, x_high, y_low, y_high),
+        categories,
+    )
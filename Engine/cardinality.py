@@ -0,0 +1,220 @@
+"""
+Bounded distinct counting and column classification
+
+Classifying a column only requires to know whether it has exactly 2, less than 10 or more than 10
+unique values, or whether all of its values are unique. The kernels below read a column in blocks
+that grow geometrically and stop as soon as the answer is decided, e.g. after the 11th distinct
+value or at the first repeated value, instead of counting every unique value.
+"""
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from Engine.sketches import hash_values
+
+# Thresholds of the column classification
+PREDICTOR_UNIQUE = 2
+CATEGORICAL_MAX_UNIQUE = 10
+NUMERICAL_MIN_UNIQUE = 10
+TEXT_UNIQUE_RATIO = 0.10
+
+FIRST_BLOCK_SIZE = 1024
+MAX_BLOCK_SIZE = 1024 * 1024
+
+
+def is_float_dtype(dtype):
+    return ptypes.is_float_dtype(dtype)
+
+
+def is_int_dtype(dtype):
+    """
+    Any integer dtype: signed, unsigned, downcast or nullable
+    """
+    return ptypes.is_integer_dtype(dtype) and not ptypes.is_bool_dtype(dtype)
+
+
+def is_text_dtype(dtype):
+    """
+    Dtypes that hold strings: object, string (python or Arrow) and category
+    """
+    return (
+        ptypes.is_object_dtype(dtype)
+        or ptypes.is_string_dtype(dtype)
+        or isinstance(dtype, pd.CategoricalDtype)
+    )
+
+
+def _blocks(series):
+    """
+    Consecutive slices of the series, starting small so that early exits are cheap
+    and doubling in size so that a full scan takes O(n log n)
+    """
+    start, size = 0, FIRST_BLOCK_SIZE
+    while start < len(series):
+        yield series.iloc[start : start + size]
+        start += size
+        size = min(2 * size, MAX_BLOCK_SIZE)
+
+
+def count_distinct_upto(series, limit):
+    """
+    :param series: a column of the dataframe
+    :param limit: the largest count that needs to be known
+    :return: the number of unique non-missing values if it is at most limit, otherwise limit + 1
+    """
+    seen = np.empty(0, dtype="uint64")
+    for block in _blocks(series):
+        block = block.dropna()
+        if len(block) == 0:
+            continue
+        seen = np.union1d(seen, hash_values(block, categorize=False))
+        if len(seen) > limit:
+            return limit + 1
+    return len(seen)
+
+
+def all_unique(series):
+    """
+    :return: whether every value of the series is unique, stops at the first missing or repeated value
+
+    Values are compared by their 64 bit hash, collisions are negligible for realistic data sizes.
+    """
+    seen = np.empty(0, dtype="uint64")
+    for block in _blocks(series):
+        if block.isna().any():
+            return False
+        hashes = np.sort(hash_values(block, categorize=False))
+        # a stable sort merges the two sorted runs in linear time
+        seen = np.sort(np.concatenate([seen, hashes]), kind="stable")
+        if np.any(seen[1:] == seen[:-1]):
+            return False
+    return True
+
+
+@dataclass
+class ColumnCardinality:
+    """
+    What the column classification needs to know about the unique values of a column
+
+    n_unique_capped is the exact number of unique values up to 10 and 11 for anything above.
+    is_text is only determined for object, string and category columns.
+    """
+
+    name: object
+    dtype: object
+    n_unique_capped: int
+    is_unique: bool
+    is_text: bool = False
+
+    @classmethod
+    def from_profile(cls, column):
+        """
+        :param column: a ColumnProfile, of which the unique values are already counted
+        """
+        n_rows = column.n_rows
+        return cls(
+            name=column.name,
+            dtype=column.dtype,
+            n_unique_capped=min(column.n_unique, NUMERICAL_MIN_UNIQUE + 1),
+            is_unique=column.n_unique == n_rows,
+            is_text=is_text_dtype(column.dtype)
+            and n_rows > 0
+            and column.n_unique / n_rows >= TEXT_UNIQUE_RATIO,
+        )
+
+    @classmethod
+    def from_series(cls, series):
+        """
+        Determine the cardinality with the bounded kernels, without counting all unique values
+        """
+        n_rows = len(series)
+        n_unique_capped = count_distinct_upto(series, NUMERICAL_MIN_UNIQUE)
+        if n_unique_capped <= NUMERICAL_MIN_UNIQUE or n_rows <= NUMERICAL_MIN_UNIQUE:
+            is_unique = n_unique_capped == n_rows
+        elif is_float_dtype(series.dtype):
+            # floats are never identifiers, no need to look for repeated values
+            is_unique = False
+        else:
+            is_unique = all_unique(series)
+
+        is_text = False
+        if is_text_dtype(series.dtype) and n_rows > 0:
+            required = math.ceil(TEXT_UNIQUE_RATIO * n_rows)
+            is_text = count_distinct_upto(series, required - 1) >= required
+
+        return cls(
+            name=series.name,
+            dtype=series.dtype,
+            n_unique_capped=n_unique_capped,
+            is_unique=is_unique,
+            is_text=is_text,
+        )
+
+
+class ColumnKinds:
+    """
+    Classification of the columns of a dataframe into the name lists used throughout the application
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(ColumnCardinality.from_series(df[name]) for name in df.columns)
+
+    @classmethod
+    def from_profile(cls, profile):
+        return cls(ColumnCardinality.from_profile(column) for column in profile)
+
+    def names(self, condition):
+        return [column.name for column in self.columns if condition(column)]
+
+    def float_names(self):
+        return self.names(lambda column: is_float_dtype(column.dtype))
+
+    def int_names(self):
+        return self.names(lambda column: is_int_dtype(column.dtype))
+
+    def predictor_names(self):
+        """
+        Columns that contain two unique values
+        """
+        return self.names(lambda column: column.n_unique_capped == PREDICTOR_UNIQUE)
+
+    def id_names(self):
+        """
+        Columns in which every value is unique, floats excluded
+        """
+        return self.names(
+            lambda column: column.is_unique and not is_float_dtype(column.dtype)
+        )
+
+    def numerical_names(self):
+        """
+        Integer columns with more than 10 unique values and all float columns, identifiers excluded
+        """
+        int_names = self.names(
+            lambda column: is_int_dtype(column.dtype)
+            and column.n_unique_capped > NUMERICAL_MIN_UNIQUE
+        )
+        num_names = int_names + self.float_names()
+        id_names = self.id_names()
+        return [x for x in num_names if x not in id_names]
+
+    def categorical_names(self):
+        """
+        Columns with less than 10 unique values
+        """
+        return self.names(
+            lambda column: column.n_unique_capped < CATEGORICAL_MAX_UNIQUE
+        )
+
+    def text_names(self):
+        """
+        Text columns of which at least 10% of the values is unique
+        """
+        return self.names(lambda column: column.is_text)
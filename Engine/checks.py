@@ -0,0 +1,77 @@
+"""
+Data quality checks without user interface
+
+The checks of the preprocessing section, so that they can run in the application as well as
+in batch jobs, see Engine/cli.py. Duplicates and mixed data types are found by Engine/duplicates.py
+and Engine/mixed_types.py.
+"""
+
+# Columns with at least this percentage of missing values should be dropped, below it imputed
+DROP_PERCENT_MISSING = 10
+
+
+def missing_columns(percent_missing):
+    """
+    :param percent_missing: df with percentage of missing values for each variable
+    :return: the columns that should be dropped and the columns that should be imputed
+    """
+    drop_columns = []
+    impute_columns = []
+    for index, row in percent_missing.iterrows():
+        if row[0] >= DROP_PERCENT_MISSING:
+            drop_columns.append(index)
+        elif 0.000 < row[0] < DROP_PERCENT_MISSING:
+            impute_columns.append(index)
+    return drop_columns, impute_columns
+
+
+def missing_verdicts(percent_missing):
+    """
+    :param percent_missing: df with percentage of missing values for each variable
+    :return: list of columns that are still missing, list of messages to return to the user, and the type
+    of message that is return to the user
+    """
+
+    still_missing = percent_missing.index[percent_missing.iloc[:, 0] > 0].tolist()
+
+    message = []
+    type = []
+    drop_columns, impute_columns = missing_columns(percent_missing)
+    if drop_columns is not None:
+        drop_string = ", ".join(map(str, drop_columns))
+        if len(drop_columns) > 1:
+            message.append(
+                ":warning: The columns **{}** contain more than 10% of missing values, you should consider "
+                "**dropping** these "
+                "columns if the columns do not contain valuable information.".format(
+                    drop_string
+                )
+            )
+            type.append("drop")
+        elif len(drop_columns) == 1:
+            message.append(
+                ":warning: **{}** contains more than 10% of missing values, you should consider **dropping** this "
+                "column if the column does not contain valuable information.".format(
+                    drop_string
+                )
+            )
+            type.append("drop")
+    if impute_columns is not None:
+        impute_string = ", ".join(map(str, impute_columns))
+        if len(impute_columns) > 1:
+            message.append(
+                "**{}** contain between 0 and 10% of missing values, you should "
+                "consider **imputing** the values.".format(impute_string)
+            )
+        elif len(impute_columns) == 1:
+            message.append(
+                ":construction: **{}** contains between 0 and 10% of missing values, you should "
+                "consider **imputing** the values for this column.".format(
+                    impute_string
+                )
+            )
+        type.append("impute")
+
+    if len(still_missing) == 0:
+        message = ":heavy_check_mark: There are no missing values in your data."
+    return still_missing, message, type
@@ -0,0 +1,244 @@
+"""
+Batch profiling from the command line
+
+Runs the checks of the application without Streamlit, e.g. in a nightly pipeline:
+
+    python -m Engine profile extracts/ other.csv --workers 8 --output-dir reports/
+
+Every file is profiled in its own process and produces one JSON document with the summary table,
+the describe table, the missing value verdicts, the duplicate rows and the mixed data type columns.
+With --combined the statistics of all files together are reported as well, they are merged from
+mergeable sketches so no file is read twice.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from Engine import checks, readers, sniff
+from Engine.accumulators import DatasetAccumulator
+from Engine.duplicates import RowHashIndex
+from Engine.mixed_types import find_mixed_types
+from Engine.profile import DatasetProfile
+
+SUPPORTED_EXTENSIONS = (".csv", ".txt", ".xlsx", ".xls", ".parquet", ".feather", ".arrow")
+
+# Datasets with at least this many rows get estimated unique values, see helpers.py
+APPROXIMATE_DISTINCT_ROWS = 1_000_000
+
+
+def expand_paths(paths):
+    """
+    :param paths: files and directories
+    :return: the files, directories are searched recursively for files with a supported extension
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, _, names in sorted(os.walk(path)):
+            files.extend(
+                os.path.join(root, name)
+                for name in sorted(names)
+                if name.lower().endswith(SUPPORTED_EXTENSIONS)
+            )
+    return files
+
+
+def _table(frame):
+    """
+    :return: the table as a dict of rows, missing values become null
+    """
+    return json.loads(frame.to_json(orient="index", default_handler=str))
+
+
+def _statistics(profile):
+    return {
+        "n_rows": profile.n_rows,
+        "n_columns": profile.n_columns,
+        "total_missing": profile.total_missing,
+        "summary": _table(profile.summary_table()),
+        "describe": _table(profile.describe()),
+        "estimated_quartiles": [
+            str(column.name) for column in profile if not column.quantiles_exact
+        ],
+    }
+
+
+def profile_file(
+    path,
+    delimiter=None,
+    approximate_rows=APPROXIMATE_DISTINCT_ROWS,
+    error=0.01,
+    combine=False,
+):
+    """
+    :param path: the file to profile
+    :param delimiter: the delimiter of a csv file, None detects the delimiter
+    :param approximate_rows: see DatasetProfile.from_frame
+    :param error: the relative error of estimated unique values
+    :param combine: also return a DatasetAccumulator of the file, to combine the statistics of all files
+    :return: a dict that can be serialized to JSON with the results of all checks,
+    and the DatasetAccumulator or None
+    """
+    file_format = sniff.sniff(path, delimiter)
+    df = readers.read_file(path, file_format)
+    profile = DatasetProfile.from_frame(
+        df, approximate_rows=approximate_rows, error=error
+    )
+    accumulator = DatasetAccumulator(error=error).update(df) if combine else None
+
+    percent_missing = profile.percent_missing()
+    _, messages, _ = checks.missing_verdicts(percent_missing)
+    drop_columns, impute_columns = checks.missing_columns(percent_missing)
+    duplicates = RowHashIndex(df).summary()
+
+    return {
+        "path": path,
+        "format": file_format.kind,
+        **_statistics(profile),
+        "missing_values": {
+            "drop": [str(name) for name in drop_columns],
+            "impute": [str(name) for name in impute_columns],
+            "messages": [messages] if isinstance(messages, str) else messages,
+        },
+        "duplicates": {
+            "rows": duplicates.n_rows,
+            "groups": duplicates.n_groups,
+            "group_sizes": {str(size): count for size, count in duplicates.size_counts.items()},
+        },
+        "mixed_types": {
+            str(column.name): {
+                "type_counts": column.type_counts,
+                "example_rows": {
+                    name: [str(row) for row in rows] for name, rows in column.examples.items()
+                },
+            }
+            for column in find_mixed_types(df)
+        },
+    }, accumulator
+
+
+def _profile_or_error(path, options):
+    """
+    Profile one file, a file that cannot be read results in an error instead of stopping the batch
+    """
+    try:
+        return profile_file(path, **options)
+    except Exception as exception:
+        error = "{}: {}".format(type(exception).__name__, exception)
+        return {"path": path, "error": error}, None
+
+
+def profile_files(paths, workers=None, **options):
+    """
+    :param paths: the files to profile
+    :param workers: the number of processes, None uses all cores and 1 profiles in this process
+    :param options: keyword arguments of profile_file
+    :return: an iterator over the results and accumulators of profile_file, in the order of the paths
+    """
+    if workers == 1:
+        for path in paths:
+            yield _profile_or_error(path, options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_profile_or_error, paths, [options] * len(paths))
+
+
+def report_names(paths):
+    """
+    :return: the file name of the report of every path, relative to the directory that all paths have in
+    common, so that a/data.csv and b/data.csv get different reports
+    """
+    if not paths:
+        return {}
+    absolute = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in absolute])
+    # the extension is kept, so that data.csv and data.parquet get different reports
+    return {path: os.path.relpath(full, root) + ".json" for path, full in zip(paths, absolute)}
+
+
+def _write(result, name, output_dir=None):
+    """
+    Print the result as one line of JSON, or write it to output_dir under name and print its path
+    """
+    if output_dir is None:
+        print(json.dumps(result))
+        return
+    output_path = os.path.join(output_dir, name)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as file:
+        json.dump(result, file, indent=2)
+    print(output_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m Engine", description="Data quality checks without the user interface"
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    profile = commands.add_parser("profile", help="profile csv, excel, parquet and arrow files")
+    profile.add_argument("paths", nargs="+", help="files or directories with files")
+    profile.add_argument("--delimiter", help="delimiter of csv files, detected by default")
+    profile.add_argument(
+        "--workers", type=int, help="number of processes, all cores by default"
+    )
+    profile.add_argument(
+        "--output-dir",
+        help="write one JSON file per input file to this directory, by default JSON lines are printed",
+    )
+    profile.add_argument(
+        "--approximate-rows",
+        type=int,
+        default=APPROXIMATE_DISTINCT_ROWS,
+        help="estimate unique values of datasets with at least this many rows",
+    )
+    profile.add_argument(
+        "--error", type=float, default=0.01, help="relative error of estimated unique values"
+    )
+    profile.add_argument(
+        "--combined",
+        action="store_true",
+        help="also report the statistics of all files together, columns are matched by name",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    :return: the exit code, 1 if any of the files could not be profiled
+    """
+    args = parse_args(argv)
+    paths = expand_paths(args.paths)
+    names = report_names(paths)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    failed = False
+    combined = DatasetAccumulator(error=args.error)
+    results = profile_files(
+        paths,
+        workers=args.workers,
+        delimiter=args.delimiter,
+        approximate_rows=args.approximate_rows,
+        error=args.error,
+        combine=args.combined,
+    )
+    for result, accumulator in results:
+        failed = failed or "error" in result
+        _write(result, names[result["path"]], args.output_dir)
+        if "error" in result:
+            print("{path}: {error}".format(**result), file=sys.stderr)
+        if accumulator is not None:
+            combined.merge(accumulator)
+
+    if args.combined:
+        # the quartiles of the combined files come from the merged quantile sketches
+        result = {"path": None, "files": len(paths), **_statistics(combined.to_profile())}
+        _write(result, "combined.json", args.output_dir)
+    return 1 if failed else 0
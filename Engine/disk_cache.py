@@ -0,0 +1,250 @@
+"""
+Persistent cache of parsed uploads
+
+Parsed csv and excel files are stored on local disk as uncompressed Arrow IPC (Feather) files,
+keyed by a hash of the uploaded bytes and the parse options. A cache hit memory-maps the file
+instead of parsing the upload again, and the cache survives restarts and deploys.
+
+Dataframes that Arrow cannot represent, such as columns that mix strings and numbers, are
+stored as pickles instead. Those are not memory-mapped but still skip parsing.
+
+A cache with a budget evicts the least recently used entries when it grows beyond it. Reading an
+entry updates its modification time, which is the recency. Every file or directory in the cache
+directory is an entry, so directories that other modules store there are evicted as well.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+CACHE_DIR = os.environ.get(
+    "DQC_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "data_quality_checker"),
+)
+
+# Number of bytes that is hashed at once
+BLOCK_SIZE = 1024 * 1024
+
+# temporary files and directories of writes that did not finish are removed after this many seconds
+STALE_SECONDS = 24 * 3600
+
+EXTENSIONS = (".arrow", ".pkl")
+
+
+def content_digest(source):
+    """
+    :param source: a path or file-like object
+    :return: the sha256 hex digest of the content, computed block by block without copying the whole file
+    """
+    digest = hashlib.sha256()
+    if hasattr(source, "getbuffer"):
+        with source.getbuffer() as buffer:
+            for start in range(0, len(buffer), BLOCK_SIZE):
+                digest.update(buffer[start : start + BLOCK_SIZE])
+    elif hasattr(source, "read"):
+        position = source.tell()
+        source.seek(0)
+        while True:
+            block = source.read(BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block.encode("utf-8") if isinstance(block, str) else block)
+        source.seek(position)
+    else:
+        with open(source, "rb") as file:
+            for block in iter(lambda: file.read(BLOCK_SIZE), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(digest, options, **extra):
+    """
+    :param digest: the content digest of the file, see content_digest
+    :param options: the options the file is parsed with, a dict or dataclass such as sniff.FileFormat
+    :param extra: further options that select what is read from the file, e.g. the sheet of a workbook
+    :return: the key under which the parsed file is stored
+    """
+    if dataclasses.is_dataclass(options):
+        options = dataclasses.asdict(options)
+    options = dict(options, **extra)
+    serialized = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha256((digest + serialized).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Directory with one Arrow IPC (or pickle) file per cached dataframe
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=None):
+        """
+        :param max_bytes: the budget of the cache on disk, None never evicts
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key, extension=".arrow"):
+        return os.path.join(self.directory, key + extension)
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key)) or os.path.exists(self.path(key, ".pkl"))
+
+    def get(self, key, columns=None):
+        """
+        :param columns: the columns to read, None reads all columns
+        :return: the cached dataframe, memory-mapped from disk, or None if the key is not cached
+        """
+        path = self.path(key)
+        try:
+            if os.path.exists(path):
+                table = feather.read_table(path, columns=columns, memory_map=True)
+                touch(path)
+                return table.to_pandas(split_blocks=True)
+            if os.path.exists(self.path(key, ".pkl")):
+                df = pd.read_pickle(self.path(key, ".pkl"))
+                touch(self.path(key, ".pkl"))
+                return df if columns is None else df[columns]
+        except (pa.ArrowException, OSError, EOFError):
+            # a corrupt file is treated as a cache miss
+            pass
+        return None
+
+    def _write(self, key, extension, write):
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            write(temporary)
+        except Exception:
+            os.remove(temporary)
+            raise
+        # the rename is atomic, concurrent readers never see a partially written file
+        os.replace(temporary, self.path(key, extension))
+        # a replaced entry may have been stored with the other extension
+        for other in EXTENSIONS:
+            if other != extension:
+                remove(self.path(key, other))
+        self.evict(keep=[self.path(key, extension)])
+
+    def put(self, key, df):
+        """
+        Store the dataframe under the key, as Arrow if possible and as a pickle otherwise
+        """
+        try:
+            # uncompressed, so that the file can be memory-mapped without decompressing it
+            self._write(
+                key,
+                ".arrow",
+                lambda path: feather.write_feather(df, path, compression="uncompressed"),
+            )
+        except (pa.ArrowException, ValueError, TypeError):
+            self._write(key, ".pkl", df.to_pickle)
+
+    def get_or_load(self, key, load, columns=None):
+        """
+        :param load: a function without arguments that parses the file on a cache miss
+        :return: the cached dataframe; a freshly parsed one is read back after it is stored,
+        so that a miss returns the same dtypes and memory-mapped columns as a hit
+        """
+        df = self.get(key, columns)
+        if df is None:
+            df = load()
+            if df is not None:
+                self.put(key, df)
+                cached = self.get(key, columns)
+                if cached is not None:
+                    return cached
+                if columns is not None:
+                    df = df[columns]
+        return df
+
+    def entries(self):
+        """
+        :return: the path, size in bytes and modification time of every entry, oldest first;
+        temporaries of unfinished writes are not entries, stale ones are removed
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                modified = os.path.getmtime(path)
+                if name.endswith(".tmp"):
+                    if time.time() - modified > STALE_SECONDS:
+                        remove(path)
+                    continue
+                entries.append((path, disk_usage(path), modified))
+            except OSError:
+                # removed by another process in the meantime
+                continue
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, keep=()):
+        """
+        Remove the least recently used entries until the cache fits its budget
+        :param keep: paths of entries that are in use and are never removed
+        :return: the number of bytes that was removed
+        """
+        if self.max_bytes is None:
+            return 0
+        entries = self.entries()
+        excess = sum(size for _, size, _ in entries) - self.max_bytes
+        removed = 0
+        keep = {os.path.abspath(path) for path in keep}
+        for path, size, _ in entries:
+            if removed >= excess:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            remove(path)
+            removed += size
+        return removed
+
+
+def touch(path):
+    """
+    Mark an entry as recently used
+    """
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def remove(path):
+    """
+    Remove a file or directory, memory-mapped files stay readable for the processes that map them
+    """
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def disk_usage(path):
+    """
+    :return: the number of bytes of a file or of all files in a directory
+    """
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
@@ -0,0 +1,104 @@
+"""
+Memory-optimised dtypes
+
+Numerical columns are downcast to the smallest type that holds their values, string columns with
+few distinct values are dictionary-encoded as category and the remaining string columns are stored
+as Arrow-backed strings when the installed pandas supports them. Columns that mix types are left
+untouched, so that the mixed data type check still finds them.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+from pandas.api.types import infer_dtype
+
+# String columns with at most this ratio of unique values are stored as category
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def arrow_string_dtype():
+    """
+    :return: the Arrow-backed string dtype, or None if the installed pandas does not provide it
+    """
+    try:
+        return pd.StringDtype("pyarrow")
+    except (TypeError, ImportError, AttributeError):
+        return None
+
+
+@dataclass
+class DtypeReport:
+    """
+    Memory usage before and after optimising, and the dtype changes per column
+    """
+
+    memory_before: int
+    memory_after: int
+    changes: dict = field(default_factory=dict)
+
+    @property
+    def saved(self):
+        return self.memory_before - self.memory_after
+
+    def to_frame(self):
+        return pd.DataFrame(
+            [(str(before), str(after)) for before, after in self.changes.values()],
+            index=list(self.changes),
+            columns=["Before", "After"],
+        )
+
+
+def _downcast_float(series):
+    """
+    Cast to float32 only if every value survives the round trip
+    """
+    values = series.to_numpy()
+    downcast = values.astype("float32")
+    if np.array_equal(downcast.astype(values.dtype), values, equal_nan=True):
+        return pd.Series(downcast, index=series.index, name=series.name)
+    return series
+
+
+def optimise_column(series, category_max_unique_ratio=CATEGORY_MAX_UNIQUE_RATIO):
+    """
+    :param series: a column of the dataframe
+    :return: the column with the most memory-efficient dtype that keeps its values
+    """
+    dtype = series.dtype
+    if ptypes.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if ptypes.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast="integer")
+    if ptypes.is_float_dtype(dtype):
+        return _downcast_float(series)
+    if ptypes.is_object_dtype(dtype) and infer_dtype(series, skipna=True) == "string":
+        n_present = series.count()
+        if n_present and series.nunique() / n_present <= category_max_unique_ratio:
+            return series.astype("category")
+        string_dtype = arrow_string_dtype()
+        if string_dtype is not None:
+            return series.astype(string_dtype)
+    return series
+
+
+def optimise_dtypes(df, category_max_unique_ratio=CATEGORY_MAX_UNIQUE_RATIO):
+    """
+    :param df: the loaded data
+    :return: a dataframe with optimised dtypes and a DtypeReport with the memory before and after
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    optimised = pd.DataFrame(
+        {
+            name: optimise_column(df[name], category_max_unique_ratio)
+            for name in df.columns
+        },
+        index=df.index,
+    )
+    changes = {
+        name: (df[name].dtype, optimised[name].dtype)
+        for name in df.columns
+        if df[name].dtype != optimised[name].dtype
+    }
+    memory_after = int(optimised.memory_usage(deep=True).sum())
+    return optimised, DtypeReport(memory_before, memory_after, changes)
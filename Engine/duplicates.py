@@ -0,0 +1,151 @@
+"""
+Hash-based duplicate detection
+
+Every column is hashed once to one 64 bit value per row. The hash of a row for a selection of
+columns combines the hashes of those columns, so changing the selection only recombines arrays that
+are already computed instead of grouping the dataframe again. Rows with equal combined hashes are
+candidates, and only the candidates are compared value by value, so a collision of two different rows
+is never reported: rows are duplicates when their values are equal, as df.duplicated(keep=False)
+finds them, and missing values are equal to each other.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from Engine.sketches import hash_values
+
+# odd multiplier that mixes the column hashes into the row hash, the order of the columns matters
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+@dataclass
+class DuplicateSummary:
+    """
+    The duplicate groups for a selection of columns, without materialising the groups
+
+    size_counts maps the size of a group to the number of groups of that size.
+    """
+
+    n_rows: int
+    n_groups: int
+    size_counts: dict = field(default_factory=dict)
+
+    @property
+    def largest_group(self):
+        return max(self.size_counts, default=0)
+
+
+def candidates(hashes):
+    """
+    :param hashes: one hash per row, see RowHashIndex.row_hashes
+    :return: the positions of the rows whose hash occurs more than once, in order
+    """
+    return np.flatnonzero(pd.Series(hashes).duplicated(keep=False).to_numpy())
+
+
+def group_keys(hashes, columns):
+    """
+    :param hashes: the hashes of the candidate rows
+    :param columns: for every compared column, its values in the candidate rows
+    :return: one integer per candidate row that is equal for rows with equal hashes and values
+    """
+    keys, _ = pd.factorize(hashes)
+    for values in columns:
+        # equal values get equal codes, missing values get -1, as df.duplicated compares them
+        codes, uniques = pd.factorize(values)
+        keys, _ = pd.factorize(keys * (len(uniques) + 1) + codes + 1)
+    return keys
+
+
+def summarise(keys):
+    """
+    :param keys: one key per row that is equal for duplicate rows, see group_keys
+    :return: a DuplicateSummary with the number of duplicate rows and groups and the group sizes
+    """
+    sizes = pd.Series(keys).value_counts()
+    sizes = sizes[sizes > 1]
+    size_counts = sizes.value_counts().sort_index()
+    return DuplicateSummary(
+        n_rows=int(sizes.sum()),
+        n_groups=len(sizes),
+        size_counts={int(size): int(count) for size, count in size_counts.items()},
+    )
+
+
+def duplicate_groups(keys):
+    """
+    :param keys: one key per row that is equal for duplicate rows, see group_keys
+    :return: the positions of the duplicate rows, the rows of a group are placed together in order of first appearance
+    """
+    positions = np.flatnonzero(pd.Series(keys).duplicated(keep=False).to_numpy())
+    groups, _ = pd.factorize(keys[positions])
+    return positions[np.argsort(groups, kind="stable")]
+
+
+class RowHashIndex:
+    """
+    Per-column row hashes of a dataframe, computed once per column when it is first selected,
+    and the verified duplicate groups of the last selection of columns
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._column_hashes = {}
+        self._groups = None
+
+    def column_hashes(self, name):
+        if name not in self._column_hashes:
+            self._column_hashes[name] = hash_values(self.df[name])
+        return self._column_hashes[name]
+
+    def row_hashes(self, columns=None):
+        """
+        :param columns: the columns that are compared, None compares all columns
+        :return: one hash per row that is equal for rows with equal values in the columns
+        """
+        columns = self.df.columns if columns is None else columns
+        # the columns are combined in dataframe order, so the selection order does not matter
+        selected = set(columns)
+        hashes = np.zeros(len(self.df), dtype="uint64")
+        with np.errstate(over="ignore"):
+            for name in self.df.columns:
+                if name in selected:
+                    hashes = (hashes ^ self.column_hashes(name)) * _MULTIPLIER
+        return hashes
+
+    def group_keys(self, columns=None):
+        """
+        :return: the positions of the candidate rows and their keys, see group_keys
+        """
+        selection = tuple(self.df.columns if columns is None else columns)
+        if self._groups is None or self._groups[0] != selection:
+            hashes = self.row_hashes(selection)
+            positions = candidates(hashes)
+            # the columns are compared in dataframe order, like they are hashed
+            selected = set(selection)
+            values = (self.df[name].iloc[positions] for name in self.df.columns if name in selected)
+            self._groups = selection, (positions, group_keys(hashes[positions], values))
+        return self._groups[1]
+
+    def duplicated(self, columns=None):
+        """
+        :return: a boolean mask of the rows that have at least one duplicate, like df.duplicated(keep=False)
+        """
+        positions, keys = self.group_keys(columns)
+        mask = np.zeros(len(self.df), dtype="bool")
+        mask[positions] = pd.Series(keys).duplicated(keep=False).to_numpy()
+        return mask
+
+    def summary(self, columns=None):
+        """
+        :return: a DuplicateSummary with the number of duplicate rows and groups and the group sizes
+        """
+        return summarise(self.group_keys(columns)[1])
+
+    def rows(self, columns=None):
+        """
+        :return: the duplicate rows, the rows of a group are placed together in order of first appearance
+        """
+        positions, keys = self.group_keys(columns)
+        return self.df.iloc[positions[duplicate_groups(keys)]]
@@ -0,0 +1,102 @@
+"""
+Streaming Excel reader
+
+Reads xlsx workbooks row by row with openpyxl in read-only mode instead of loading the full
+workbook into memory. Sheet names come from the workbook metadata, so picking a sheet does not
+parse any of the sheets. Legacy xls workbooks are read with pd.read_excel.
+"""
+import openpyxl
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+from Engine.sniff import read_sample
+
+# number of rows per chunk when a sheet is streamed
+CHUNK_SIZE = 100_000
+
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+def _is_xlsx(source):
+    return read_sample(source, size=4).startswith(_ZIP_MAGIC)
+
+
+def _open(source):
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+
+def sheet_names(source):
+    """
+    :param source: a path or file-like object with an excel workbook
+    :return: the names of the sheets in the workbook, read from its metadata
+    """
+    if not _is_xlsx(source):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.ExcelFile(source).sheet_names
+    workbook = _open(source)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _header(row):
+    return [
+        "Unnamed: {}".format(position) if value is None else str(value)
+        for position, value in enumerate(row)
+    ]
+
+
+def _to_frame(header, rows):
+    """
+    Convert raw cell values to a dataframe with the same type inference as pd.read_excel
+    """
+    return TextParser([header] + rows, header=0).read()
+
+
+def iter_sheet_chunks(source, sheet=None, chunksize=CHUNK_SIZE):
+    """
+    :param source: a path or file-like object with an excel workbook
+    :param sheet: the name of the sheet to read, None reads the first sheet
+    :param chunksize: the number of rows per chunk
+    :return: an iterator over dataframes of at most chunksize rows, the first row is the header
+
+    Empty rows are skipped, as pd.read_excel does.
+    """
+    if not _is_xlsx(source):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        yield pd.read_excel(source, sheet_name=sheet if sheet is not None else 0)
+        return
+
+    workbook = _open(source)
+    try:
+        worksheet = workbook[sheet] if sheet is not None else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = _header(next(rows, ()))
+        width = len(header)
+        buffer, n_chunks = [], 0
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            buffer.append(list(row[:width]) + [None] * (width - len(row)))
+            if len(buffer) == chunksize:
+                yield _to_frame(header, buffer)
+                buffer, n_chunks = [], n_chunks + 1
+        if buffer or n_chunks == 0:
+            yield _to_frame(header, buffer)
+    finally:
+        workbook.close()
+
+
+def read_sheet(source, sheet=None, chunksize=CHUNK_SIZE):
+    """
+    :return: the full sheet as a single dataframe, see iter_sheet_chunks
+    """
+    chunks = list(iter_sheet_chunks(source, sheet, chunksize))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,76 @@
+"""
+Range filters on a sorted index
+
+The values of a numerical column are sorted once, together with their row positions. Selecting the
+rows inside or outside a range then takes two binary searches instead of comparing every value, and
+results in the row positions of the selection instead of a copy of the dataframe.
+"""
+import numpy as np
+import pandas as pd
+
+
+class SortedIndex:
+    """
+    The non-missing values of a column in sorted order, with the row position of each value
+    """
+
+    def __init__(self, series):
+        values = series.to_numpy()
+        missing = pd.isna(values)
+        present = np.flatnonzero(~missing)
+        order = np.argsort(values[present], kind="stable")
+        self.positions = present[order]
+        self.values = values[self.positions]
+        self.missing = np.flatnonzero(missing)
+        self.n_rows = len(values)
+
+    @property
+    def min(self):
+        return self.values[0] if len(self.values) else np.nan
+
+    @property
+    def max(self):
+        return self.values[-1] if len(self.values) else np.nan
+
+    def _bounds(self, low, high):
+        return (
+            np.searchsorted(self.values, low, side="left"),
+            np.searchsorted(self.values, high, side="right"),
+        )
+
+    def between(self, low, high):
+        """
+        :return: the sorted row positions with low <= value <= high, like series.between(low, high)
+        """
+        start, stop = self._bounds(low, high)
+        return np.sort(self.positions[start:stop])
+
+    def outside(self, low, high):
+        """
+        :return: the sorted row positions of the other rows, like ~series.between(low, high),
+        so missing values are included
+        """
+        start, stop = self._bounds(low, high)
+        return np.sort(
+            np.concatenate([self.positions[:start], self.positions[stop:], self.missing])
+        )
+
+
+def select(series, rows=None):
+    """
+    :param rows: row positions, None selects all rows
+    :return: the values of the series at the row positions
+    """
+    if rows is None:
+        return series
+    return series.take(rows)
+
+
+def isin(series, values, rows=None):
+    """
+    :return: the row positions within rows where the series has one of the values
+    """
+    mask = select(series, rows).isin(values).to_numpy()
+    if rows is None:
+        return np.flatnonzero(mask)
+    return rows[mask]
@@ -0,0 +1,100 @@
+"""
+Lazy computation graph
+
+Every derived quantity of the report is a node with declared inputs, which are other nodes or input
+values such as the dataset and the filter. Nothing is computed until a section asks for a node, and
+a computed node is reused until the version of one of its inputs changes.
+
+The version of a node follows from the versions of its inputs, so whether a result can be reused is
+known without computing anything. Results are keyed by version in a ResultCache, which lets sessions
+with different data share one graph without overwriting each other's results.
+"""
+from Engine.result_cache import ResultCache
+
+
+class Node:
+    def __init__(self, name, function, inputs):
+        self.name = name
+        self.function = function
+        self.inputs = tuple(inputs)
+
+
+class Graph:
+    """
+    The nodes of the report and the results that have been computed for them
+    """
+
+    def __init__(self, cache=None, timer=None):
+        """
+        :param cache: the ResultCache of the node results, which may be shared with other functions
+        :param timer: a function of a node name that returns a context manager around computing the node,
+        e.g. to measure its duration
+        """
+        self.nodes = {}
+        self.cache = cache if cache is not None else ResultCache()
+        self.timer = timer
+
+    def node(self, *inputs, name=None):
+        """
+        Decorator that adds a function as a node, the function receives the values of its inputs
+        followed by the parameters the node is asked for with, e.g. the column of a histogram
+        """
+
+        def register(function):
+            self.nodes[name or function.__name__] = Node(
+                name or function.__name__, function, inputs
+            )
+            return function
+
+        return register
+
+    def bind(self, **inputs):
+        """
+        :param inputs: for every input a tuple of its value and a hashable version
+        :return: an Evaluation of the graph for these inputs
+        """
+        return Evaluation(self, inputs)
+
+
+class Evaluation:
+    """
+    The graph with values for its inputs, nodes are computed when they are asked for
+    """
+
+    def __init__(self, graph, inputs):
+        self.graph = graph
+        self.inputs = dict(inputs)
+
+    def with_inputs(self, **inputs):
+        """
+        :return: an Evaluation in which some inputs have other values, e.g. after filtering
+        """
+        return Evaluation(self.graph, dict(self.inputs, **inputs))
+
+    def version(self, name, *parameters):
+        """
+        :return: a hashable version that changes whenever the value of the node can change
+        """
+        if name in self.inputs:
+            return self.inputs[name][1]
+        node = self.graph.nodes[name]
+        return (name, tuple(self.version(input) for input in node.inputs), parameters)
+
+    def get(self, name, *parameters):
+        """
+        :return: the value of an input or node, a node is computed only if no result of the same version exists
+        """
+        if name in self.inputs:
+            return self.inputs[name][0]
+        key = self.version(name, *parameters)
+        found, value = self.graph.cache.lookup(key, name)
+        if not found:
+            node = self.graph.nodes[name]
+            arguments = [self.get(input) for input in node.inputs]
+            if self.graph.timer is not None:
+                with self.graph.timer(name):
+                    value = node.function(*arguments, *parameters)
+            else:
+                value = node.function(*arguments, *parameters)
+            self.graph.cache.put(key, value, name)
+        return value
@@ -0,0 +1,56 @@
+"""
+Dataset handles
+
+A DatasetHandle pairs a dataframe with a token that identifies its content. The token of a loaded
+file is computed once, from the digest of the file and the options it is read with, and every
+transform of the data derives a new token from the old one and the transform. Caches key on the
+token, so the dataframe itself is never hashed to find a cached result.
+"""
+import hashlib
+import json
+import uuid
+
+
+class DatasetHandle:
+    """
+    A dataframe and the token of its version, treat the dataframe as read-only:
+    a changed dataframe needs a new token, see derive
+    """
+
+    def __init__(self, frame, token):
+        self.frame = frame
+        self.token = token
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        :return: a handle of a dataframe of unknown origin, with a random token so that it never
+        shares cached results with another dataframe
+        """
+        return cls(frame, uuid.uuid4().hex)
+
+    def derive(self, frame, transform, *parameters):
+        """
+        :param frame: the transformed dataframe
+        :param transform: the name of the transform, e.g. "optimise_dtypes"
+        :param parameters: the parameters of the transform, which need a stable repr
+        :return: a handle of the transformed dataframe, its token follows from this token and the transform
+        """
+        serialized = json.dumps([self.token, transform, parameters], default=repr)
+        return DatasetHandle(frame, hashlib.sha256(serialized.encode("utf-8")).hexdigest())
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __repr__(self):
+        return "DatasetHandle({:,d} rows x {:,d} columns, {})".format(
+            self.frame.shape[0], self.frame.shape[1], self.token[:12]
+        )
+
+
+def hash_handle(handle):
+    return handle.token
+
+
+# hash_funcs for st.cache: functions that take a handle are keyed on its token
+HASH_FUNCS = {DatasetHandle: hash_handle}
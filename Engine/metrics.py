@@ -0,0 +1,154 @@
+"""
+Prometheus metrics
+
+The time spent parsing files, computing the report and drawing the sections, the size of the loaded
+files and the lookups of the result caches. They are served on /metrics of a separate port, see serve.
+"""
+import logging
+import os
+import threading
+
+from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+
+# buckets of the durations in seconds, from a cache hit to a profile of a large file
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# buckets of the size of a loaded file in bytes, from 1 KB to 10 GB
+BYTES_BUCKETS = tuple(10 ** exponent for exponent in range(3, 11))
+
+PARSE_SECONDS = Histogram(
+    "dqc_parse_seconds",
+    "Time to parse or read a file, cached files are not parsed again",
+    ["format"],
+    buckets=SECONDS_BUCKETS,
+)
+LOADED_FILES = Counter("dqc_loaded_files_total", "Number of files loaded", ["format"])
+LOADED_ROWS = Counter("dqc_loaded_rows_total", "Number of rows loaded", ["format"])
+LOADED_COLUMNS = Counter("dqc_loaded_columns_total", "Number of columns loaded", ["format"])
+LOADED_BYTES = Histogram(
+    "dqc_loaded_file_bytes", "Size of the loaded files", ["format"], buckets=BYTES_BUCKETS
+)
+COMPUTE_SECONDS = Histogram(
+    "dqc_compute_seconds",
+    "Time to compute a node of the report when it is not cached",
+    ["node"],
+    buckets=SECONDS_BUCKETS,
+)
+SECTION_SECONDS = Histogram(
+    "dqc_section_seconds",
+    "Time to show a section of the application, including cached results",
+    ["section"],
+    buckets=SECONDS_BUCKETS,
+)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_serving = []
+_collected = {}
+
+
+def source_size(source):
+    """
+    :param source: a path or the file selected by the user
+    :return: the size of the file in bytes
+    """
+    if hasattr(source, "getbuffer"):
+        with source.getbuffer() as buffer:
+            return buffer.nbytes
+    if hasattr(source, "seek"):
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+        return size
+    return os.path.getsize(source)
+
+
+def observe_load(kind, source, df):
+    """
+    Count a loaded file
+    :param kind: the format of the file, see sniff.FileFormat
+    :param source: the path or file it was loaded from
+    :param df: the loaded dataframe
+    """
+    LOADED_FILES.labels(kind).inc()
+    LOADED_ROWS.labels(kind).inc(df.shape[0])
+    LOADED_COLUMNS.labels(kind).inc(df.shape[1])
+    LOADED_BYTES.labels(kind).observe(source_size(source))
+
+
+def time_node(name):
+    """
+    :return: a context manager that times computing a node of the report, see graph.Graph
+    """
+    return COMPUTE_SECONDS.labels(name).time()
+
+
+def time_section(name):
+    """
+    :return: a context manager that times showing a section
+    """
+    return SECTION_SECONDS.labels(name).time()
+
+
+class CacheCollector:
+    """
+    Reads the counts of result caches when the metrics are scraped
+    """
+
+    def __init__(self, caches):
+        """
+        :param caches: a dict of ResultCaches by the name they are reported with
+        """
+        self.caches = caches
+
+    def collect(self):
+        hits = CounterMetricFamily(
+            "dqc_cache_hits", "Results found in the cache", labels=["cache", "function"]
+        )
+        misses = CounterMetricFamily(
+            "dqc_cache_misses", "Results computed as they were not in the cache", labels=["cache", "function"]
+        )
+        evictions = CounterMetricFamily(
+            "dqc_cache_evictions", "Results evicted to stay within the budget", labels=["cache", "function"]
+        )
+        size = GaugeMetricFamily("dqc_cache_bytes", "Bytes held by the cache", labels=["cache"])
+        budget = GaugeMetricFamily("dqc_cache_budget_bytes", "Budget of the cache", labels=["cache"])
+        for cache_name, cache in self.caches.items():
+            for function, stats in cache.stats().items():
+                labels = [cache_name, str(function)]
+                hits.add_metric(labels, stats.hits)
+                misses.add_metric(labels, stats.misses)
+                evictions.add_metric(labels, stats.evictions)
+            size.add_metric([cache_name], cache.n_bytes)
+            budget.add_metric([cache_name], cache.max_bytes)
+        return [hits, misses, evictions, size, budget]
+
+
+def register_caches(**caches):
+    """
+    Report the lookups of the given ResultCaches, a name that is already reported is left as it is
+    """
+    with _lock:
+        new = {name: cache for name, cache in caches.items() if name not in _collected}
+        if new:
+            _collected.update(new)
+            REGISTRY.register(CacheCollector(new))
+
+
+def serve(port, addr=""):
+    """
+    Serve the metrics on http://addr:port/metrics, only the first call of a process starts the server
+    :param port: the port to serve on, 0 or None serves nothing
+    When the port is in use, e.g. by a second instance of the app, a warning is logged and the app runs without metrics
+    """
+    if not port:
+        return
+    with _lock:
+        if not _serving:
+            try:
+                start_http_server(port, addr)
+            except OSError as error:
+                logger.warning("Metrics are not served, port %s is not available: %s", port, error)
+            _serving.append(port)
@@ -0,0 +1,150 @@
+"""
+Parallel profiling of wide tables
+
+The columns are split in batches and every batch is profiled by a worker. Threads share the dataframe
+and run in parallel as far as the kernels release the GIL, which the numerical value_counts do.
+Processes also profile object columns in parallel; they do not receive the dataframe itself but read
+their columns from an Arrow file that every process memory-maps, see Engine/disk_cache.py. With a disk
+cache and a key for the data the file is written once and reused by every later profile, e.g. of another
+filter: the workers receive the row positions of the filter, never a filtered copy.
+"""
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from Engine.disk_cache import DiskCache
+from Engine.filters import select
+from Engine.profile import DatasetProfile, profile_column
+
+# number of batches per worker, more batches balance the load better between workers
+BATCHES_PER_WORKER = 4
+
+EXECUTORS = ("thread", "process")
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def batches(n_columns, workers, batch_size=None):
+    """
+    :return: lists of column positions, one list per batch
+    """
+    if batch_size is None:
+        batch_size = max(1, math.ceil(n_columns / (workers * BATCHES_PER_WORKER)))
+    return [
+        list(range(start, min(start + batch_size, n_columns)))
+        for start in range(0, n_columns, batch_size)
+    ]
+
+
+def _profile_batch(df, positions, rows, options):
+    return [
+        profile_column(select(df.iloc[:, position], rows), **options)
+        for position in positions
+    ]
+
+
+def _profile_spilled_batch(directory, key, positions, names, rows, options):
+    """
+    Profile columns of the dataframe that was spilled to a disk cache under key, in a worker process
+    """
+    df = DiskCache(directory).get(key, columns=[str(position) for position in positions])
+    if df is None:
+        raise FileNotFoundError("The columns to profile were removed from {}".format(directory))
+    profiles = []
+    for position, name in zip(positions, names):
+        profile = profile_column(select(df[str(position)], rows), **options)
+        profile.name = name
+        profiles.append(profile)
+    return profiles
+
+
+def _profile_processes(df, cache, key, workers, position_batches, rows, options):
+    if key not in cache:
+        # the columns are stored by position, so that any column name survives the round trip
+        spilled = df.reset_index(drop=True)
+        spilled.columns = [str(position) for position in range(df.shape[1])]
+        cache.put(key, spilled)
+    names = list(df.columns)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            _profile_spilled_batch,
+            [cache.directory] * len(position_batches),
+            [key] * len(position_batches),
+            position_batches,
+            [[names[position] for position in positions] for positions in position_batches],
+            [rows] * len(position_batches),
+            [options] * len(position_batches),
+        )
+        return [profile for batch in results for profile in batch]
+
+
+def profile_columns(
+    df, workers=None, executor="thread", batch_size=None, rows=None, cache=None, key=None, **options
+):
+    """
+    :param df: the input data
+    :param rows: the row positions to profile, e.g. of a filter, None profiles all rows.
+    The columns are selected one at a time, the dataframe itself is not copied
+    :param workers: the number of threads or processes, None uses all cores and 1 profiles serially
+    :param executor: "thread" or "process"
+    :param batch_size: the number of columns per batch, None makes BATCHES_PER_WORKER batches per worker
+    :param cache: a DiskCache that keeps the data for the processes under key, e.g. derived from the token
+    of the data. None writes the data to a temporary directory on every call
+    :param options: keyword arguments of profile_column
+    :return: the ColumnProfile of every column, in column order
+    """
+    if executor not in EXECUTORS:
+        raise ValueError("executor should be one of {}".format(", ".join(EXECUTORS)))
+    workers = workers or default_workers()
+    n_columns = df.shape[1]
+    if workers == 1 or n_columns <= 1:
+        return _profile_batch(df, range(n_columns), rows, options)
+
+    position_batches = batches(n_columns, workers, batch_size)
+    if executor == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                lambda positions: _profile_batch(df, positions, rows, options), position_batches
+            )
+            return [profile for batch in results for profile in batch]
+
+    if cache is None or key is None:
+        with tempfile.TemporaryDirectory(prefix="dqc-profile-") as directory:
+            return _profile_processes(df, DiskCache(directory), "frame", workers, position_batches, rows, options)
+    return _profile_processes(df, cache, key, workers, position_batches, rows, options)
+
+
+def profile_frame(
+    df,
+    rows=None,
+    workers=None,
+    executor="thread",
+    approximate_rows=None,
+    max_exact=4096,
+    error=0.01,
+    cache=None,
+    key=None,
+):
+    """
+    Parallel version of DatasetProfile.from_frame
+    :param rows: the row positions to profile, None profiles all rows
+    :param cache: the DiskCache and key of the data for worker processes, see profile_columns
+    :return: a DatasetProfile, the same as the serial one
+    """
+    n_rows = df.shape[0] if rows is None else len(rows)
+    approximate = approximate_rows is not None and n_rows >= approximate_rows
+    columns = profile_columns(
+        df,
+        rows=rows,
+        workers=workers,
+        executor=executor,
+        approximate=approximate,
+        max_exact=max_exact,
+        error=error,
+        cache=cache,
+        key=key,
+    )
+    return DatasetProfile(columns, n_rows=n_rows)
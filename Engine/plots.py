@@ -0,0 +1,108 @@
+"""
+Plots drawn from the aggregates of Engine/aggregates.py, in the style of the seaborn plots they replace
+"""
+import numpy as np
+import seaborn as sns
+from matplotlib.patches import Patch
+
+
+def histogram(ax, hist, label=None):
+    """
+    Bars of the bin densities with the density curve on top, like seaborn's distplot
+    :param hist: an aggregates.Histogram
+    """
+    color = sns.color_palette()[0]
+    if hist.n:
+        ax.bar(
+            hist.edges[:-1],
+            hist.bin_density,
+            width=np.diff(hist.edges),
+            align="edge",
+            color=color,
+            alpha=0.4,
+            edgecolor="white",
+            linewidth=0.5,
+        )
+        ax.plot(hist.grid, hist.density, color=color)
+    if label is not None:
+        ax.set_xlabel(label)
+    return ax
+
+
+def boxplot(ax, stats, x_label=None, y_label=None):
+    """
+    One box per group, like seaborn's boxplot
+    :param stats: the five-number summaries of aggregates.box_stats
+    """
+    colors = sns.color_palette(n_colors=max(len(stats), 1))
+    boxes = ax.bxp(
+        stats,
+        widths=0.8,
+        patch_artist=True,
+        flierprops={"marker": "d", "markersize": 4, "markerfacecolor": "0.3", "markeredgecolor": "0.3"},
+        medianprops={"color": "0.3"},
+        whiskerprops={"color": "0.3"},
+        capprops={"color": "0.3"},
+    )
+    for patch, color in zip(boxes["boxes"], colors):
+        patch.set_facecolor(color)
+        patch.set_edgecolor("0.3")
+    ax.set_xticklabels([str(box["label"]) for box in stats])
+    if x_label is not None:
+        ax.set_xlabel(x_label)
+    if y_label is not None:
+        ax.set_ylabel(y_label)
+    return ax
+
+
+def countplot(ax, counts, label=None):
+    """
+    One bar per category, like seaborn's countplot
+    :param counts: the counts of aggregates.category_counts
+    """
+    positions = np.arange(len(counts))
+    ax.bar(
+        positions, counts.to_numpy(), color=sns.color_palette(n_colors=max(len(counts), 1))
+    )
+    ax.set_xticks(positions)
+    ax.set_xticklabels([str(category) for category in counts.index])
+    if label is not None:
+        ax.set_xlabel(label)
+    ax.set_ylabel("count")
+    return ax
+
+
+def density_scatterplot(ax, raster, x_label=None, y_label=None, hue_label=None):
+    """
+    The points as an image of a fixed size: the colour of a cell mixes the colours of the categories
+    in it and its opacity grows with the logarithm of the number of points
+    :param raster: an aggregates.DensityRaster
+    """
+    colors = np.array(sns.color_palette(n_colors=len(raster.categories)))
+    total = raster.counts.sum(axis=0)
+    image = np.zeros(total.shape + (4,))
+    filled = total > 0
+    if filled.any():
+        mixed = np.tensordot(raster.counts, colors, axes=([0], [0]))
+        image[..., :3][filled] = mixed[filled] / total[filled][:, None]
+        image[..., 3] = np.log1p(total) / np.log1p(total.max())
+        # every cell with points stays visible
+        image[..., 3][filled] = np.maximum(image[..., 3][filled], 0.2)
+    ax.imshow(
+        image,
+        extent=raster.extent,
+        origin="lower",
+        aspect="auto",
+        interpolation="nearest",
+    )
+    if raster.categories != [None]:
+        handles = [
+            Patch(color=color, label=str(category))
+            for category, color in zip(raster.categories, colors)
+        ]
+        ax.legend(handles=handles, title=hue_label)
+    if x_label is not None:
+        ax.set_xlabel(x_label)
+    if y_label is not None:
+        ax.set_ylabel(y_label)
+    return ax
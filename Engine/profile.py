@@ -0,0 +1,336 @@
+"""
+Column profiling engine
+
+Every statistic that the helpers and sections show per column (unique, missing and zero
+values, type, min/max, mean/std and quantiles) is derived from a single value_counts of
+that column, so a page render scans each column once instead of once per helper.
+
+For large columns the unique values can be estimated with a HyperLogLog sketch instead,
+which avoids building a hash table of every distinct value.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+from Engine.cardinality import (
+    ColumnKinds,
+    all_unique,
+    count_distinct_upto,
+    is_text_dtype,
+)
+from Engine.sketches import DistinctCounter, weighted_quantile
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+@dataclass
+class ColumnProfile:
+    """
+    Statistics of a single column
+    The numerical statistics (min, max, mean, std, quantiles) are None for non-numerical columns
+    """
+
+    name: object
+    dtype: object
+    n_rows: int
+    n_missing: int
+    n_unique: int
+    n_zero: int
+    n_unique_exact: bool = True
+    min: float = None
+    max: float = None
+    mean: float = None
+    std: float = None
+    quantiles: dict = field(default_factory=dict)
+    quantiles_exact: bool = True
+    # the sketch of the unique values, to merge profiles of chunks or subsets
+    distinct: DistinctCounter = field(default=None, repr=False, compare=False)
+
+    @property
+    def n_present(self):
+        return self.n_rows - self.n_missing
+
+    @property
+    def is_numeric(self):
+        """
+        Numerical in the sense of df.describe(), so booleans are excluded
+        """
+        return ptypes.is_numeric_dtype(self.dtype) and not ptypes.is_bool_dtype(
+            self.dtype
+        )
+
+
+def value_counts(series):
+    """
+    :return: the number of occurrences of each distinct non-missing value in the series
+    """
+    counts = series.value_counts(dropna=True, sort=False)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # unobserved categories are reported with a count of zero
+        counts = counts[counts > 0]
+    return counts
+
+
+def count_zeros(series, counts):
+    """
+    Number of values equal to 0, the equivalent of series.isin([0]).sum()
+    """
+    if ptypes.is_datetime64_any_dtype(series.dtype) or ptypes.is_timedelta64_dtype(
+        series.dtype
+    ):
+        return 0
+    try:
+        is_zero = np.asarray(counts.index == 0, dtype=bool)
+    except TypeError:
+        return 0
+    return int(counts.to_numpy()[is_zero].sum())
+
+
+def sorted_values(counts):
+    """
+    :param counts: value counts of a numerical column
+    :return: the distinct values in ascending order and their counts, both as floats
+    """
+    values = counts.index.to_numpy(dtype="float64")
+    weights = counts.to_numpy(dtype="float64")
+    order = np.argsort(values, kind="mergesort")
+    return values[order], weights[order]
+
+
+def _near(estimate, threshold, error):
+    """
+    Whether the threshold lies within three standard errors of the estimate
+    """
+    return abs(estimate - threshold) <= 3 * error * estimate
+
+
+def _profile_column_approximate(series, max_exact, error):
+    """
+    Profile without value_counts: the unique values are counted with a DistinctCounter
+    and the numerical statistics are computed on the values directly.
+
+    Counts near a threshold that the column classification depends on (all values unique,
+    10% unique values for text columns) are decided exactly with the bounded kernels.
+    """
+    missing = series.isna()
+    n_missing = int(missing.sum())
+    present = series[~missing] if n_missing > 0 else series
+    n_rows = len(series)
+
+    distinct = DistinctCounter(max_exact=max_exact, error=error)
+    distinct.add(present, categorize=False)
+    n_unique = distinct.count()
+    n_unique_exact = distinct.is_exact
+
+    if not n_unique_exact and n_missing == 0 and _near(n_unique, n_rows, error):
+        n_unique = n_rows if all_unique(present) else min(n_unique, n_rows - 1)
+    elif (
+        not n_unique_exact
+        and is_text_dtype(series.dtype)
+        and _near(n_unique, 0.1 * n_rows, error)
+    ):
+        # keep the estimate on the same side of the 10% threshold as the exact count
+        required = int(np.ceil(0.1 * n_rows))
+        if count_distinct_upto(present, required - 1) >= required:
+            n_unique = max(n_unique, required)
+        else:
+            n_unique = min(n_unique, required - 1)
+
+    if ptypes.is_datetime64_any_dtype(series.dtype) or ptypes.is_timedelta64_dtype(
+        series.dtype
+    ):
+        n_zero = 0
+    elif ptypes.is_bool_dtype(series.dtype):
+        n_zero = int((~present.astype(bool)).sum())
+    elif ptypes.is_numeric_dtype(series.dtype):
+        n_zero = int((present.to_numpy() == 0).sum())
+    else:
+        n_zero = int(present.isin([0]).sum())
+
+    profile = ColumnProfile(
+        name=series.name,
+        dtype=series.dtype,
+        n_rows=n_rows,
+        n_missing=n_missing,
+        n_unique=n_unique,
+        n_zero=n_zero,
+        n_unique_exact=n_unique_exact,
+        distinct=distinct,
+    )
+
+    if profile.is_numeric and len(present) > 0:
+        values = present.to_numpy(dtype="float64")
+        profile.min = float(values.min())
+        profile.max = float(values.max())
+        profile.mean = float(values.mean())
+        profile.std = float(values.std(ddof=1)) if len(values) > 1 else np.nan
+        quartiles = np.percentile(values, [100 * q for q in QUANTILES])
+        profile.quantiles = dict(zip(QUANTILES, quartiles.tolist()))
+    return profile
+
+
+def profile_column(series, approximate=False, max_exact=4096, error=0.01):
+    """
+    :param series: a column of the dataframe
+    :param approximate: estimate the number of unique values once there are more than max_exact
+    :param error: the relative standard error of the estimated number of unique values
+    :return: a ColumnProfile computed from one value_counts of the column
+    """
+    if approximate:
+        return _profile_column_approximate(series, max_exact, error)
+
+    counts = value_counts(series)
+
+    n_rows = len(series)
+    n_present = int(counts.sum())
+    profile = ColumnProfile(
+        name=series.name,
+        dtype=series.dtype,
+        n_rows=n_rows,
+        n_missing=n_rows - n_present,
+        n_unique=len(counts),
+        n_zero=count_zeros(series, counts),
+    )
+
+    if profile.is_numeric and n_present > 0:
+        values, weights = sorted_values(counts)
+        cumulative = np.cumsum(weights)
+
+        mean = float((values * weights).sum() / n_present)
+        profile.min = float(values[0])
+        profile.max = float(values[-1])
+        profile.mean = mean
+        if n_present > 1:
+            variance = ((values - mean) ** 2 * weights).sum() / (n_present - 1)
+            profile.std = float(np.sqrt(variance))
+        else:
+            profile.std = np.nan
+        profile.quantiles = {
+            q: weighted_quantile(values, cumulative, n_present, q) for q in QUANTILES
+        }
+    return profile
+
+
+class DatasetProfile:
+    """
+    The profiles of all columns of a dataframe
+    Provides the column name lists and the summary tables used throughout the application
+    """
+
+    def __init__(self, columns, n_rows):
+        self.columns = list(columns)
+        self.n_rows = n_rows
+        self._by_name = {column.name: column for column in self.columns}
+
+    @classmethod
+    def from_frame(cls, df, approximate_rows=None, max_exact=4096, error=0.01):
+        """
+        :param df: the input data
+        :param approximate_rows: estimate the unique values when the data has at least this many rows,
+        None always counts exactly
+        :param max_exact: unique values are counted exactly up to this number, also when estimating
+        :param error: the relative standard error of estimated unique values
+        :return: a DatasetProfile, each column is scanned exactly once
+        """
+        approximate = approximate_rows is not None and df.shape[0] >= approximate_rows
+        columns = [
+            profile_column(df[name], approximate, max_exact, error)
+            for name in df.columns
+        ]
+        return cls(columns, n_rows=df.shape[0])
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    @property
+    def n_columns(self):
+        return len(self.columns)
+
+    @property
+    def total_missing(self):
+        return int(sum(column.n_missing for column in self.columns))
+
+    def names(self, condition):
+        """
+        :param condition: a function that receives a ColumnProfile and returns a boolean
+        :return: the names of the columns that satisfy the condition, in column order
+        """
+        return [column.name for column in self.columns if condition(column)]
+
+    def kinds(self):
+        """
+        :return: ColumnKinds with the column name lists, based on the counted unique values
+        """
+        return ColumnKinds.from_profile(self)
+
+    # Summary tables
+
+    def _series(self, attribute, name, dtype="int64"):
+        return pd.Series(
+            [getattr(column, attribute) for column in self.columns],
+            index=[column.name for column in self.columns],
+            name=name,
+            dtype=dtype,
+        )
+
+    def unique_values(self):
+        return self._series("n_unique", "Unique Values")
+
+    def missing_values(self):
+        return self._series("n_missing", "Missing Values")
+
+    def percent_missing(self):
+        return (self.missing_values() * 100 / self.n_rows).to_frame("Percent Missing")
+
+    def zero_values(self):
+        return self._series("n_zero", "Zero Values").to_frame()
+
+    def data_types(self):
+        return self._series("dtype", "Variable Type", dtype="object").to_frame()
+
+    def summary_table(self):
+        """
+        :return: table with the unique, missing, percentage missing and zero values and the type of each variable
+        """
+        return pd.concat(
+            [
+                self.unique_values(),
+                self.missing_values(),
+                self.percent_missing(),
+                self.zero_values(),
+                self.data_types(),
+            ],
+            axis=1,
+        )
+
+    def describe(self):
+        """
+        The numerical summary of df.describe(): mean, std, min, quartiles and max
+        """
+        numeric = [column for column in self.columns if column.is_numeric]
+        index = ["mean", "std", "min", "25%", "50%", "75%", "max"]
+        table = pd.DataFrame(
+            {
+                column.name: [
+                    column.mean,
+                    column.std,
+                    column.min,
+                    column.quantiles.get(0.25),
+                    column.quantiles.get(0.5),
+                    column.quantiles.get(0.75),
+                    column.max,
+                ]
+                for column in numeric
+            },
+            index=index,
+            dtype="float64",
+        )
+        return table
@@ -0,0 +1,141 @@
+"""
+Readers for the supported file formats
+"""
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import feather, ipc
+
+from Engine import excel
+
+# number of rows per chunk when a file is streamed
+CHUNK_SIZE = 100_000
+
+
+def _text_source(source, encoding):
+    """
+    Open the source as text that replaces the bytes that are invalid in the encoding,
+    the encoding is detected from the start of the file and a later byte can still be invalid
+    """
+    if hasattr(source, "read"):
+        source.seek(0)
+        return io.StringIO(source.read().decode(encoding, errors="replace"))
+    return open(source, encoding=encoding, errors="replace", newline="")
+
+
+def read_csv(source, file_format):
+    """
+    :param source: a path or file-like object with csv data
+    :param file_format: the FileFormat of the file, see sniff.sniff
+    :return: a pandas dataframe
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    try:
+        return pd.read_csv(source, **file_format.csv_options())
+    except UnicodeDecodeError:
+        # parse once more with the invalid bytes replaced
+        with _text_source(source, file_format.encoding) as text:
+            return pd.read_csv(text, **dict(file_format.csv_options(), encoding=None))
+
+
+def iter_csv_chunks(source, file_format, chunksize=CHUNK_SIZE):
+    """
+    :param source: a path or file-like object with csv data
+    :param file_format: the FileFormat of the file, see sniff.sniff
+    :param chunksize: the number of rows per chunk, this bounds the memory that is used
+    :return: an iterator over dataframes of at most chunksize rows
+
+    When a byte is invalid in the encoding the file is parsed once more with the invalid bytes replaced,
+    the rows before it decode the same way and are skipped.
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    n_rows = 0
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunksize, **file_format.csv_options()):
+            n_rows += len(chunk)
+            yield chunk
+        return
+    except UnicodeDecodeError:
+        pass
+    with _text_source(source, file_format.encoding) as text:
+        for chunk in pd.read_csv(text, chunksize=chunksize, **dict(file_format.csv_options(), encoding=None)):
+            if n_rows >= len(chunk):
+                n_rows -= len(chunk)
+                continue
+            yield chunk.iloc[n_rows:]
+            n_rows = 0
+
+
+def _arrow_source(source):
+    """
+    Wrap the source in a pyarrow file without copying it:
+    files on disk are memory-mapped and in-memory uploads are read through their buffer
+    """
+    if hasattr(source, "getbuffer"):
+        return pa.BufferReader(pa.py_buffer(source.getbuffer()))
+    if hasattr(source, "read"):
+        source.seek(0)
+        return pa.BufferReader(source.read())
+    return pa.memory_map(str(source), "r")
+
+
+def read_columns(source, file_format):
+    """
+    :return: the column names of a parquet or arrow file, only the metadata is read
+    """
+    if file_format == "parquet":
+        return pq.ParquetFile(_arrow_source(source)).schema_arrow.names
+    try:
+        return ipc.open_file(_arrow_source(source)).schema.names
+    except pa.ArrowInvalid:
+        # Feather version 1 files are not Arrow IPC files, read their metadata through feather
+        return feather.read_table(_arrow_source(source)).schema.names
+
+
+def read_columnar(source, file_format, columns=None):
+    """
+    :param source: a path or binary file-like object with parquet or arrow (feather) data
+    :param file_format: "parquet" or "arrow", see sniff.sniff
+    :param columns: the columns to read, None reads all columns
+    :return: a pandas dataframe
+
+    Only the requested columns are read from the file. Arrow files are memory-mapped, so columns
+    without missing values are converted to pandas without copying them.
+    """
+    if file_format == "parquet":
+        table = pq.read_table(_arrow_source(source), columns=columns)
+    else:
+        table = feather.read_table(_arrow_source(source), columns=columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def read_file(source, file_format, columns=None, sheet=None):
+    """
+    :param source: a path or file-like object
+    :param file_format: the FileFormat of the file, see sniff.sniff
+    :param columns: the columns to load from a parquet or arrow file, None loads all columns
+    :param sheet: the sheet to load from an excel file, None loads the first sheet
+    :return: a pandas dataframe, the file is parsed once with the reader that matches its format
+    """
+    if file_format.is_columnar:
+        return read_columnar(source, file_format.kind, columns)
+    if file_format.kind == "excel":
+        return excel.read_sheet(source, sheet)
+    return read_csv(source, file_format)
+
+
+def iter_chunks(source, file_format, chunksize=CHUNK_SIZE, sheet=None):
+    """
+    :param source: a path or file-like object with a csv or excel file
+    :param file_format: the FileFormat of the file, see sniff.sniff
+    :param chunksize: the number of rows per chunk
+    :param sheet: the sheet to read from an excel file, None reads the first sheet
+    :return: an iterator over dataframes of at most chunksize rows
+    """
+    if file_format.kind == "excel":
+        return excel.iter_sheet_chunks(source, sheet, chunksize)
+    return iter_csv_chunks(source, file_format, chunksize)
@@ -0,0 +1,59 @@
+"""
+Cache of rendered figures
+
+A figure is rendered once to PNG bytes and stored under a key made of a fingerprint of the data and the
+chart options. A rerun with the same data and options serves the bytes without touching matplotlib.
+The least recently used figures are evicted once the cache holds more than its byte budget.
+"""
+import hashlib
+import io
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from Engine.result_cache import ResultCache
+
+# the cache holds at most this many bytes of rendered figures
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def fingerprint(df):
+    """
+    :return: a digest of the values, index, column names and types of the dataframe,
+    equal for dataframes with equal content
+    """
+    digest = hashlib.sha256()
+    digest.update(repr((list(df.columns), [str(dtype) for dtype in df.dtypes])).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_png(fig, dpi=100):
+    """
+    :return: the figure as PNG bytes
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+class RenderCache(ResultCache):
+    """
+    Least recently used cache of rendered figures with a budget in bytes
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        super().__init__(max_bytes)
+
+    def get_or_render(self, key, draw):
+        """
+        :param draw: a function without arguments that returns the matplotlib figure, only called on a miss
+        :return: the rendered figure as PNG bytes
+        """
+        found, rendered = self.lookup(key, "render")
+        if not found:
+            fig = draw()
+            rendered = render_png(fig)
+            plt.close(fig)
+            self.put(key, rendered, "render", size=len(rendered))
+        return rendered
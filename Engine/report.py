@@ -0,0 +1,145 @@
+"""
+The quantities of the report as nodes of a lazy computation graph, see Engine/graph.py
+
+Inputs:
+- data: the loaded dataframe, its version identifies the dataset
+- rows: the row positions selected by the filters (None for all rows), its version is the filter state
+- token: the token of the dataset, the name of the columns that worker processes read from the disk cache
+"""
+from Engine import aggregates, checks, parallel
+from Engine.disk_cache import cache_key
+from Engine.cardinality import ColumnKinds, is_float_dtype, is_int_dtype
+from Engine.duplicates import RowHashIndex
+from Engine.filters import SortedIndex
+from Engine.graph import Graph
+from Engine.mixed_types import find_mixed_types
+
+
+def build_graph(
+    workers=None,
+    executor="thread",
+    approximate_rows=None,
+    error=0.01,
+    cache=None,
+    timer=None,
+    mixed_type_workers=1,
+    disk_cache=None,
+):
+    """
+    :param workers: the number of workers that profile the columns, see parallel.profile_frame
+    :param executor: "thread" or "process"
+    :param approximate_rows: estimate unique values of data with at least this many rows
+    :param error: the relative error of estimated unique values
+    :param cache: the ResultCache of the node results, None gives the graph a cache of its own
+    :param timer: a context manager around computing a node, see Graph
+    :param mixed_type_workers: the number of workers that check full columns for mixed types, see find_mixed_types
+    :param disk_cache: the DiskCache that keeps the data for worker processes, None writes it for every profile
+    :return: the Graph with every node of the report
+    """
+    graph = Graph(cache, timer)
+
+    # column classification, on all rows so that the name lists do not change while filtering
+    @graph.node("data")
+    def kinds(data):
+        return ColumnKinds.from_frame(data)
+
+    @graph.node("data")
+    def all_names(data):
+        return data.columns.tolist()
+
+    @graph.node("data")
+    def float_names(data):
+        return [name for name, dtype in data.dtypes.items() if is_float_dtype(dtype)]
+
+    @graph.node("data")
+    def int_names(data):
+        return [name for name, dtype in data.dtypes.items() if is_int_dtype(dtype)]
+
+    @graph.node("kinds")
+    def numerical_names(kinds):
+        return kinds.numerical_names()
+
+    @graph.node("kinds")
+    def categorical_names(kinds):
+        return kinds.categorical_names()
+
+    @graph.node("data", "categorical_names")
+    def frame(data, categorical_names):
+        """
+        The data with the categorical columns stored as category, which stores each distinct value only once
+        """
+        frame = data.copy(deep=False)
+        for name in categorical_names:
+            if frame[name].dtype.name != "category":
+                frame[name] = frame[name].astype("category")
+        return frame
+
+    @graph.node("frame")
+    def sorted_index(frame, column):
+        return SortedIndex(frame[column])
+
+    # the (filtered) data and its statistics
+    @graph.node("frame", "rows")
+    def filtered(frame, rows):
+        return frame if rows is None else frame.iloc[rows]
+
+    @graph.node("frame", "rows", "token")
+    def profile(frame, rows, token):
+        return parallel.profile_frame(
+            frame,
+            rows=rows,
+            workers=workers,
+            executor=executor,
+            approximate_rows=approximate_rows,
+            error=error,
+            cache=disk_cache,
+            key=None if disk_cache is None else cache_key(str(token), {"node": "frame"}),
+        )
+
+    @graph.node("profile")
+    def summary_table(profile):
+        return profile.summary_table()
+
+    @graph.node("profile")
+    def describe(profile):
+        return profile.describe()
+
+    @graph.node("profile")
+    def percent_missing(profile):
+        return profile.percent_missing()
+
+    @graph.node("percent_missing")
+    def missing_verdicts(percent_missing):
+        return checks.missing_verdicts(percent_missing)
+
+    @graph.node("filtered")
+    def row_hashes(filtered):
+        # every column is hashed before the index is cached, so that the cache counts its full size;
+        # the duplicate check selects all columns by default, which hashes them all anyway
+        index = RowHashIndex(filtered)
+        index.row_hashes()
+        return index
+
+    @graph.node("filtered")
+    def mixed_types(filtered):
+        return find_mixed_types(filtered, workers=mixed_type_workers, executor=executor)
+
+    # aggregates of the visualizations
+    @graph.node("filtered")
+    def histogram(filtered, column):
+        return aggregates.histogram(filtered[column])
+
+    @graph.node("filtered")
+    def box_stats(filtered, num_column, cat_column):
+        return aggregates.box_stats(filtered[num_column], filtered[cat_column])
+
+    @graph.node("filtered")
+    def category_counts(filtered, column):
+        return aggregates.category_counts(filtered[column])
+
+    @graph.node("filtered")
+    def density_raster(filtered, x_column, y_column, hue_column=None):
+        hue = filtered[hue_column] if hue_column is not None else None
+        return aggregates.density_raster(filtered[x_column], filtered[y_column], hue)
+
+    return graph
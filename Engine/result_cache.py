@@ -0,0 +1,212 @@
+"""
+Result cache with a memory budget
+
+Results of the helpers and the report graph are kept in one least recently used cache that is
+bounded by the memory of the results, measured like DataFrame.memory_usage(deep=True). Storing a
+result evicts the least recently used results until the cache fits its budget again, so a long
+running server does not grow with every upload. Data that several results share is counted for
+each of them, so the budget errs on the safe side.
+
+Every cached function counts its hits, misses and evictions, see ResultCache.stats.
+"""
+import dataclasses
+import functools
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# the cache holds results up to this many bytes
+MAX_BYTES = 512 * 1024 * 1024
+
+
+def sizeof(value, seen=None):
+    """
+    :return: the number of bytes of a result, including the contents of dataframes, arrays and the
+    objects it refers to, an object that is referred to more than once is counted once
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.nbytes + sum(sizeof(item, seen) for item in value.ravel())
+        return value.nbytes
+    if isinstance(value, (str, bytes, bytearray, int, float, bool, type(None))):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sizeof(key, seen) + sizeof(item, seen) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(sizeof(item, seen) for item in value)
+    if dataclasses.is_dataclass(value) or hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + sizeof(vars(value), seen)
+    if hasattr(value, "__slots__"):
+        return sys.getsizeof(value) + sum(
+            sizeof(getattr(value, name), seen) for name in value.__slots__ if hasattr(value, name)
+        )
+    return sys.getsizeof(value)
+
+
+def hash_value(value):
+    """
+    :return: a hashable key of an argument, dataframes and arrays are keyed on their content
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        digest = hashlib.sha256(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode("utf-8"))
+        return type(value).__name__, digest.hexdigest()
+    if isinstance(value, np.ndarray):
+        return "ndarray", value.dtype.str, value.shape, hashlib.sha256(value.tobytes()).hexdigest()
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, tuple(hash_value(item) for item in value)
+    if isinstance(value, dict):
+        return "dict", tuple(sorted((key, hash_value(item)) for key, item in value.items()))
+    return value
+
+
+@dataclasses.dataclass
+class CacheStats:
+    """
+    The lookups of one cached function
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResultCache:
+    """
+    Least recently used cache of results with a budget in bytes, shared by the functions that use it
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self._results = OrderedDict()
+        self._stats = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        return key in self._results
+
+    def __len__(self):
+        return len(self._results)
+
+    def _count(self, name, field):
+        stats = self._stats.setdefault(name, CacheStats())
+        setattr(stats, field, getattr(stats, field) + 1)
+
+    def lookup(self, key, name=None):
+        """
+        :param name: the function the lookup is counted for
+        :return: whether the key is cached, and the result
+        """
+        with self._lock:
+            if key not in self._results:
+                self._count(name, "misses")
+                return False, None
+            self._results.move_to_end(key)
+            self._count(name, "hits")
+            return True, self._results[key][0]
+
+    def get(self, key, name=None):
+        """
+        :return: the result, or None if the key is not cached
+        """
+        return self.lookup(key, name)[1]
+
+    def put(self, key, value, name=None, size=None):
+        """
+        Store a result, a result larger than the whole budget is not stored
+        :param size: the number of bytes of the result, None measures it with sizeof
+        """
+        if size is None:
+            size = sizeof(value)
+        with self._lock:
+            if key in self._results:
+                self.n_bytes -= self._results.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._results[key] = (value, size, name)
+            self.n_bytes += size
+            while self.n_bytes > self.max_bytes:
+                _, (_, evicted_size, evicted_name) = self._results.popitem(last=False)
+                self.n_bytes -= evicted_size
+                self._count(evicted_name, "evictions")
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.n_bytes = 0
+
+    def stats(self):
+        """
+        :return: a dict with the CacheStats of every function
+        """
+        with self._lock:
+            return {name: dataclasses.replace(stats) for name, stats in self._stats.items()}
+
+    def stats_frame(self):
+        """
+        :return: the hits, misses, evictions and hit rate of every function as a dataframe
+        """
+        return pd.DataFrame(
+            [
+                dict(dataclasses.asdict(stats), **{"hit rate": stats.hit_rate})
+                for stats in self.stats().values()
+            ],
+            index=pd.Index(list(self.stats()), name="function"),
+            columns=["hits", "misses", "evictions", "hit rate"],
+        )
+
+    def memoize(self, function=None, hash_funcs=None):
+        """
+        Decorator that caches the results of a function by its arguments, like st.cache
+        :param hash_funcs: for some types of arguments a function that returns their key, e.g. the
+        token of a DatasetHandle instead of its data
+        """
+        hash_funcs = hash_funcs or {}
+
+        def key_of(value):
+            for kind, hash_func in hash_funcs.items():
+                if isinstance(value, kind):
+                    return kind.__name__, hash_func(value)
+            return hash_value(value)
+
+        def decorate(function):
+            name = "{}.{}".format(function.__module__, function.__qualname__)
+
+            @functools.wraps(function)
+            def cached(*args, **kwargs):
+                key = (
+                    name,
+                    tuple(key_of(arg) for arg in args),
+                    tuple(sorted((keyword, key_of(arg)) for keyword, arg in kwargs.items())),
+                )
+                found, value = self.lookup(key, name)
+                if not found:
+                    value = function(*args, **kwargs)
+                    self.put(key, value, name)
+                return value
+
+            return cached
+
+        return decorate(function) if function is not None else decorate
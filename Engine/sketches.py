@@ -0,0 +1,454 @@
+"""
+Mergeable sketches
+
+Summaries of a column that can be built chunk by chunk and merged afterwards,
+so statistics over a large file only need memory for one chunk and the sketches.
+"""
+import numbers
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+from pandas.api.types import infer_dtype
+
+# the type of every value of an object array
+_type_of = np.frompyfunc(type, 1, 1)
+
+# Number of values that is hashed at once when a full column is counted
+BLOCK_SIZE = 65_536
+
+# Seed of the random choices of the quantile sketch
+SEED = 0
+
+
+def _type_salt(kind):
+    """
+    :return: a 64 bit constant per Python type, so that values that are hashed by their string do not
+    hash equal to a string with the same text
+    """
+    name = "{}.{}".format(kind.__module__, kind.__qualname__)
+    return pd.util.hash_array(np.array([name], dtype="object"))[0]
+
+
+_FLOAT_SALT = _type_salt(float)
+
+
+def _hash_numbers(array):
+    """
+    :param array: a numpy array of integers or floats
+    :return: 64 bit hashes, integers are hashed exactly as int64 and whole floats hash equal to the same
+    integer, so that a column that is parsed as integers in one chunk and as floats in another chunk
+    (because of missing values) hashes to the same values
+    """
+    if array.dtype.kind in "iu":
+        return pd.util.hash_array(array.astype("int64", copy=False))
+    array = array.astype("float64", copy=False)
+    with np.errstate(invalid="ignore"):
+        whole = np.isfinite(array) & (array == np.floor(array)) & (np.abs(array) < 2.0 ** 63)
+    hashes = np.empty(len(array), dtype="uint64")
+    hashes[whole] = pd.util.hash_array(array[whole].astype("int64"))
+    hashes[~whole] = pd.util.hash_array(array[~whole]) ^ _FLOAT_SALT
+    return hashes
+
+
+# the hash of a missing value, equal for NaN, None and NaT in float and object columns
+NULL_HASH = _hash_numbers(np.array([np.nan]))[0]
+
+
+def _hash_strings(values, kind):
+    """
+    :return: 64 bit hashes of the string representations of objects of the type kind
+    """
+    return pd.util.hash_array(values.astype(str).astype("object")) ^ _type_salt(kind)
+
+
+_fits_int64 = np.frompyfunc(lambda value: -(2 ** 63) <= value < 2 ** 63, 1, 1)
+
+
+def _hash_integers(values):
+    """
+    :param values: an object array of Python or numpy integers
+    :return: 64 bit hashes, integers that do not fit in 64 bits are hashed by their string
+    """
+    try:
+        return _hash_numbers(values.astype("int64"))
+    except OverflowError:
+        fits = _fits_int64(values).astype(bool)
+        hashes = np.empty(len(values), dtype="uint64")
+        hashes[fits] = _hash_numbers(values[fits].astype("int64"))
+        hashes[~fits] = _hash_strings(values[~fits], int)
+        return hashes
+
+
+def _hash_objects(array, categorize=True):
+    """
+    :param array: a numpy object array
+    :return: 64 bit hashes that only are equal for values that are equal in Python, so 1 and "1" differ
+    """
+    missing = pd.isna(array)
+    if infer_dtype(array, skipna=True) in ("string", "empty"):
+        hashes = pd.util.hash_array(array, categorize=categorize)
+    else:
+        hashes = np.empty(len(array), dtype="uint64")
+        codes, kinds = pd.factorize(_type_of(array))
+        for code, kind in enumerate(kinds):
+            positions = codes == code
+            values = array[positions]
+            if issubclass(kind, str):
+                hashes[positions] = pd.util.hash_array(values, categorize=categorize)
+            elif issubclass(kind, (numbers.Integral, np.bool_)):
+                # True equals 1 in Python, so booleans are hashed as integers
+                hashes[positions] = _hash_integers(values)
+            elif issubclass(kind, numbers.Real):
+                hashes[positions] = _hash_numbers(values.astype("float64"))
+            else:
+                hashes[positions] = _hash_strings(values, kind)
+    hashes[missing] = NULL_HASH
+    return hashes
+
+
+def hash_values(values, categorize=True):
+    """
+    :param values: values of a column (an Index or Series)
+    :param categorize: hash the distinct values only, which is faster when values repeat
+    but needs a hash table of the distinct values
+    :return: 64 bit hashes of the values, equal values hash equal also when the column has a
+    different dtype in another chunk. Integers are hashed exactly, also above 2 ** 53.
+    """
+    dtype = values.dtype
+    if ptypes.is_categorical_dtype(dtype):
+        categorical = values.array
+        category_hashes = hash_values(categorical.categories, categorize=False)
+        # the code of a missing value is -1, which selects NULL_HASH
+        return np.append(category_hashes, NULL_HASH)[categorical.codes]
+    if isinstance(dtype, np.dtype):
+        if ptypes.is_datetime64_any_dtype(dtype) or ptypes.is_timedelta64_dtype(dtype):
+            return pd.util.hash_array(values.to_numpy())
+        if ptypes.is_bool_dtype(dtype):
+            return _hash_numbers(values.to_numpy().astype("int64"))
+        if ptypes.is_numeric_dtype(dtype):
+            return _hash_numbers(values.to_numpy())
+    return _hash_objects(values.to_numpy(dtype="object"), categorize=categorize)
+
+
+def _leading_zeros(words, width):
+    """
+    :param words: unsigned integers that use at most width bits
+    :return: the number of leading zero bits of each word within the width
+    """
+    words = words.copy()
+    zeros = np.full(len(words), width, dtype="uint8")
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = words >> np.uint64(shift)
+        has_high = high != 0
+        zeros[has_high] -= np.uint8(shift)
+        words[has_high] = high[has_high]
+    zeros[words != 0] -= np.uint8(1)
+    return zeros
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter with a fixed memory footprint of 2 ** precision bytes
+
+    :param error: the relative standard error of the estimate, 1.04 / sqrt(2 ** precision)
+    """
+
+    def __init__(self, error=0.01):
+        precision = int(np.ceil(np.log2((1.04 / error) ** 2)))
+        self.precision = min(max(precision, 4), 18)
+        self.registers = np.zeros(2 ** self.precision, dtype="uint8")
+
+    @property
+    def error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def add_hashes(self, hashes):
+        """
+        :param hashes: 64 bit hashes of the values to add
+        """
+        hashes = np.asarray(hashes, dtype="uint64")
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype("int64")
+        remainder = hashes & np.uint64((1 << width) - 1)
+        rank = _leading_zeros(remainder, width) + np.uint8(1)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """
+        Merge the sketch of another chunk or subset into this one, both sketches need the same error
+        """
+        if other.precision != self.precision:
+            raise ValueError("Only sketches with the same error can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype("float64")))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty > 0:
+            # linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+class DistinctCounter:
+    """
+    Counts distinct values exactly while there are at most max_exact of them,
+    and switches to a HyperLogLog sketch with the given relative error above that
+
+    Keeping small counts exact ensures that decisions such as "exactly 2 unique values"
+    or "less than 10 unique values" never depend on an estimate.
+    """
+
+    def __init__(self, max_exact=4096, error=0.01):
+        self.max_exact = max_exact
+        self.error = error
+        self.hashes = np.empty(0, dtype="uint64")
+        self.sketch = None
+
+    def add_hashes(self, hashes):
+        """
+        :param hashes: 64 bit hashes of the values to add
+        """
+        if self.sketch is not None:
+            self.sketch.add_hashes(hashes)
+            return
+        self.hashes = np.union1d(self.hashes, np.asarray(hashes, dtype="uint64"))
+        if len(self.hashes) > self.max_exact:
+            self.sketch = HyperLogLog(self.error)
+            self.sketch.add_hashes(self.hashes)
+            self.hashes = np.empty(0, dtype="uint64")
+
+    def add(self, values, categorize=True):
+        """
+        :param values: non-missing values to add, see hash_values
+        """
+        for start in range(0, len(values), BLOCK_SIZE):
+            block = values[start : start + BLOCK_SIZE]
+            self.add_hashes(hash_values(block, categorize=categorize))
+
+    def merge(self, other):
+        """
+        Merge the counter of another chunk or subset into this one
+        """
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = HyperLogLog(self.error)
+                self.sketch.add_hashes(self.hashes)
+                self.hashes = np.empty(0, dtype="uint64")
+            self.sketch.merge(other.sketch)
+        else:
+            self.add_hashes(other.hashes)
+        return self
+
+    @property
+    def is_exact(self):
+        return self.sketch is None
+
+    def count(self):
+        """
+        :return: the exact number of distinct values or, above max_exact values, an estimate
+        """
+        if self.is_exact:
+            return len(self.hashes)
+        return self.sketch.count()
+
+
+def weighted_quantile(values, cumulative, n, q):
+    """
+    Linear interpolation between the closest ranks, as numpy and pandas do,
+    on sorted values with their cumulative counts
+    """
+    position = q * (n - 1)
+    lower = int(np.floor(position))
+    fraction = position - lower
+    lower_value = values[np.searchsorted(cumulative, lower, side="right")]
+    if fraction == 0:
+        return float(lower_value)
+    upper_value = values[np.searchsorted(cumulative, lower + 1, side="right")]
+    return float(lower_value + fraction * (upper_value - lower_value))
+
+
+def _add_weighted(levels, values, weights):
+    """
+    Add values with integer weights to the levels of a KLL sketch, a value with weight
+    2 ** h + 2 ** j is added once to level h and once to level j
+    """
+    weights = np.asarray(weights, dtype="int64")
+    level = 0
+    while np.any(weights > 0):
+        selected = (weights & 1) == 1
+        if np.any(selected):
+            while len(levels) <= level:
+                levels.append(np.empty(0, dtype="float64"))
+            levels[level] = np.concatenate([levels[level], values[selected]])
+        weights = weights >> 1
+        level += 1
+
+
+class KLLSketch:
+    """
+    Quantile sketch of Karnin, Lang and Liberty with a fixed memory footprint of about 3 * k values
+
+    The values are kept in levels, a value in level h stands for 2 ** h values of the input. A level that
+    is full is sorted and every other value moves one level up. The rank of a quantile is off by about
+    1.7 / k of the number of values, e.g. 0.85% for k = 200, independent of the number of values.
+    The values that move up are picked at random with a fixed seed, so the same data gives the same quantiles.
+    """
+
+    def __init__(self, k=200, seed=SEED):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype="float64")]
+        self._random = np.random.RandomState(seed)
+
+    @property
+    def error(self):
+        return 1.7 / self.k
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compact(self, level):
+        items = np.sort(self.levels[level])
+        # an odd item stays behind, so that the total weight is preserved
+        kept = items[len(items) - len(items) % 2 :]
+        pairs = items[: len(items) - len(items) % 2]
+        promoted = pairs[self._random.randint(2) :: 2]
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0, dtype="float64"))
+        self.levels[level] = kept
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def _compress(self):
+        # levels are only compacted while the sketch as a whole is over its capacity,
+        # the lowest level that is over its own capacity goes first
+        while sum(map(len, self.levels)) > sum(map(self._capacity, range(len(self.levels)))):
+            level = next(
+                level
+                for level in range(len(self.levels))
+                if len(self.levels[level]) > self._capacity(level)
+            )
+            self._compact(level)
+
+    def add(self, values, weights=None):
+        """
+        :param values: non-missing numerical values
+        :param weights: the number of occurrences of each value, None counts each value once
+        """
+        values = np.asarray(values, dtype="float64")
+        if weights is None:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+        else:
+            _add_weighted(self.levels, values, weights)
+            self.n += int(np.sum(weights))
+        self._compress()
+
+    def merge(self, other):
+        """
+        Merge the sketch of another chunk or file into this one
+        """
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0, dtype="float64"))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def sorted_items(self):
+        """
+        :return: the retained values in ascending order and the number of values each one stands for
+        """
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(items), 2 ** level, dtype="int64") for level, items in enumerate(self.levels)]
+        )
+        order = np.argsort(values, kind="mergesort")
+        return values[order], weights[order]
+
+    def quantile(self, q):
+        values, weights = self.sorted_items()
+        return weighted_quantile(values, np.cumsum(weights), self.n, q)
+
+
+class QuantileSketch:
+    """
+    Keeps the distinct values with their counts while there are at most max_exact of them,
+    and switches to a KLLSketch above that
+
+    Small columns, and columns with few distinct values, get exact quantiles; the sketch
+    is only used when the exact values do not fit in a bounded amount of memory.
+    """
+
+    def __init__(self, max_exact=4096, k=200, seed=SEED):
+        self.max_exact = max_exact
+        self.k = k
+        self.seed = seed
+        self.values = np.empty(0, dtype="float64")
+        self.weights = np.empty(0, dtype="int64")
+        self.sketch = None
+
+    @property
+    def n(self):
+        if self.sketch is not None:
+            return self.sketch.n
+        return int(self.weights.sum())
+
+    @property
+    def is_exact(self):
+        return self.sketch is None
+
+    def add(self, values, weights=None):
+        """
+        :param values: non-missing numerical values
+        :param weights: the number of occurrences of each value, None counts each value once
+        """
+        values = np.asarray(values, dtype="float64")
+        weights = (
+            np.ones(len(values), dtype="int64")
+            if weights is None
+            else np.asarray(weights, dtype="int64")
+        )
+        if self.sketch is not None:
+            self.sketch.add(values, weights)
+            return
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        self.values, inverse = np.unique(values, return_inverse=True)
+        self.weights = np.bincount(inverse, weights=weights).astype("int64")
+        if len(self.values) > self.max_exact:
+            self.sketch = KLLSketch(self.k, self.seed)
+            self.sketch.add(self.values, self.weights)
+            self.values = np.empty(0, dtype="float64")
+            self.weights = np.empty(0, dtype="int64")
+
+    def merge(self, other):
+        """
+        Merge the quantiles of another chunk or file into this one
+        """
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = KLLSketch(self.k, self.seed)
+                self.sketch.add(self.values, self.weights)
+                self.values = np.empty(0, dtype="float64")
+                self.weights = np.empty(0, dtype="int64")
+            self.sketch.merge(other.sketch)
+        else:
+            self.add(other.values, other.weights)
+        return self
+
+    def quantile(self, q):
+        """
+        :return: the exact quantile or, above max_exact distinct values, an estimate; None without values
+        """
+        if self.n == 0:
+            return None
+        if self.sketch is not None:
+            return self.sketch.quantile(q)
+        return weighted_quantile(self.values, np.cumsum(self.weights), self.n, q)
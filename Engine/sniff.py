@@ -0,0 +1,130 @@
+"""
+File format detection
+
+Inspects the first bytes of a file to decide how it should be parsed, so that every file is
+parsed exactly once with the right reader and options instead of trying readers until one
+of them does not raise.
+"""
+import csv
+from dataclasses import dataclass
+
+# Number of bytes that is inspected to detect the format and the csv dialect
+SAMPLE_SIZE = 16 * 1024
+
+# Delimiters that are considered when sniffing a csv file
+DELIMITERS = ",;|\t"
+
+MAGIC_BYTES = {
+    b"PAR1": "parquet",
+    b"ARROW1": "arrow",
+    b"FEA1": "arrow",
+    # xlsx files are zip archives, xls files are OLE2 compound documents
+    b"PK\x03\x04": "excel",
+    b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1": "excel",
+}
+
+ENCODINGS = ("utf-8-sig", "latin-1")
+
+
+@dataclass
+class FileFormat:
+    """
+    The detected format of a file and, for csv files, the options to parse it with
+    """
+
+    kind: str
+    delimiter: str = ","
+    quotechar: str = '"'
+    skipinitialspace: bool = False
+    encoding: str = "utf-8"
+
+    @property
+    def is_columnar(self):
+        return self.kind in ("parquet", "arrow")
+
+    def csv_options(self):
+        """
+        :return: keyword arguments for pd.read_csv
+        """
+        return {
+            "sep": self.delimiter,
+            "quotechar": self.quotechar,
+            "skipinitialspace": self.skipinitialspace,
+            "header": "infer",
+            "encoding": self.encoding,
+        }
+
+
+def read_sample(source, size=SAMPLE_SIZE):
+    """
+    :param source: a path or file-like object
+    :return: the first bytes of the file, the position of a file-like object is left unchanged
+    """
+    if hasattr(source, "read"):
+        position = source.tell()
+        source.seek(0)
+        sample = source.read(size)
+        source.seek(position)
+    else:
+        with open(source, "rb") as file:
+            sample = file.read(size)
+    if isinstance(sample, str):
+        sample = sample.encode("utf-8")
+    return sample
+
+
+def _decode(sample):
+    for encoding in ENCODINGS:
+        try:
+            return sample.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    # latin-1 decodes any byte sequence, so this is never reached
+    return sample.decode("utf-8", errors="replace"), "utf-8"
+
+
+def _complete_lines(sample):
+    """
+    Drop the last line of the sample as it is most likely cut off
+    """
+    end = sample.rfind(b"\n")
+    return sample[: end + 1] if end > 0 else sample
+
+
+def sniff_csv(text, delimiters=DELIMITERS):
+    """
+    :param text: the first lines of a csv file
+    :return: FileFormat with the delimiter and quote character of the csv file. The header is always
+    inferred by pandas: csv.Sniffer.has_header guesses wrong for files whose columns are all text.
+    """
+    sniffer = csv.Sniffer()
+    file_format = FileFormat(kind="csv")
+    try:
+        dialect = sniffer.sniff(text, delimiters=delimiters)
+    except csv.Error:
+        # a single column or too little data to decide, fall back to the defaults
+        return file_format
+
+    file_format.delimiter = dialect.delimiter
+    file_format.quotechar = dialect.quotechar or '"'
+    file_format.skipinitialspace = dialect.skipinitialspace
+    return file_format
+
+
+def sniff(source, delimiter=None):
+    """
+    :param source: a path or file-like object selected by the user
+    :param delimiter: a delimiter chosen by the user, None detects the delimiter
+    :return: FileFormat that describes how the file should be parsed
+    """
+    sample = read_sample(source)
+    for magic, kind in MAGIC_BYTES.items():
+        if sample.startswith(magic):
+            return FileFormat(kind=kind)
+
+    text, encoding = _decode(_complete_lines(sample))
+    file_format = sniff_csv(text, delimiters=delimiter or DELIMITERS)
+    if delimiter is not None:
+        file_format.delimiter = delimiter
+    file_format.encoding = encoding
+    return file_format
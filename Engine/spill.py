@@ -0,0 +1,266 @@
+"""
+Out-of-core datasets
+
+A file that is larger than memory is converted chunk by chunk to a directory with one uncompressed
+Arrow IPC file per chunk, see Engine/disk_cache.py. Stored in the directory of a DiskCache with a
+budget, the directory is one entry that is evicted as a whole. The checks then read the data column by column:
+a column is read one chunk at a time from the memory-mapped files, so only one chunk of one column is
+in memory at once. The duplicate check also keeps one 64 bit hash per row, and counting the hashes takes
+up to about 60 bytes per row at its peak, when all rows are distinct.
+
+Chunks that Arrow cannot store, such as chunks of a column that mixes numbers and strings, are stored
+as pickles. Reading a column of such a chunk reads the whole chunk.
+"""
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+from pandas.api.types import infer_dtype
+
+from Engine.accumulators import ColumnAccumulator
+from Engine.disk_cache import DiskCache, touch
+from Engine.duplicates import _MULTIPLIER, candidates, duplicate_groups, group_keys, summarise
+from Engine.mixed_types import MIXED_TYPES, N_EXAMPLES, MixedTypeColumn, _type_of
+from Engine.profile import DatasetProfile
+from Engine.sketches import hash_values
+
+# the file with the column names and chunk sizes of a spilled dataset
+METADATA = "spill.json"
+
+
+class SpillEvictedError(FileNotFoundError):
+    """
+    A chunk of a spilled dataset was removed while it was read, e.g. evicted from the disk cache by another session
+    """
+
+
+class SpilledFrame:
+    """
+    A dataset stored on disk as one Arrow file per chunk, the columns are stored by position
+    """
+
+    def __init__(self, directory, names, chunk_rows):
+        self.directory = directory
+        self.names = list(names)
+        self.chunk_rows = list(chunk_rows)
+        self.offsets = np.concatenate([[0], np.cumsum(self.chunk_rows, dtype="int64")])
+        self._cache = DiskCache(directory)
+
+    @classmethod
+    def from_chunks(cls, chunks, directory):
+        """
+        Write the chunks to directory, a directory that already holds a spilled dataset is reused
+        :param chunks: an iterable of dataframes with the same columns, e.g. readers.iter_chunks
+        :return: the SpilledFrame
+        """
+        if os.path.exists(os.path.join(directory, METADATA)):
+            return cls.open(directory)
+        # a directory without metadata was left by a conversion that was interrupted while it was removed
+        shutil.rmtree(directory, ignore_errors=True)
+
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        temporary = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+        try:
+            cache = DiskCache(temporary)
+            names, chunk_rows = None, []
+            for chunk in chunks:
+                if names is None:
+                    names = list(chunk.columns)
+                spilled = chunk.reset_index(drop=True)
+                spilled.columns = [str(position) for position in range(spilled.shape[1])]
+                cache.put(_chunk_key(len(chunk_rows)), spilled)
+                chunk_rows.append(len(chunk))
+            with open(os.path.join(temporary, METADATA), "w") as file:
+                json.dump({"names": names or [], "chunk_rows": chunk_rows}, file, default=str)
+            # the rename is atomic, a concurrent conversion of the same file keeps the first result
+            try:
+                os.rename(temporary, directory)
+            except OSError:
+                shutil.rmtree(temporary, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(temporary, ignore_errors=True)
+            raise
+        return cls.open(directory)
+
+    @classmethod
+    def open(cls, directory):
+        with open(os.path.join(directory, METADATA)) as file:
+            metadata = json.load(file)
+        # the directory is an entry of a disk cache, opening it marks it as recently used
+        touch(directory)
+        return cls(directory, metadata["names"], metadata["chunk_rows"])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __repr__(self):
+        return "SpilledFrame({:,d} rows x {:,d} columns, {:,d} chunks)".format(
+            len(self), self.n_columns, self.n_chunks
+        )
+
+    @property
+    def n_columns(self):
+        return len(self.names)
+
+    @property
+    def n_chunks(self):
+        return len(self.chunk_rows)
+
+    def _read(self, chunk, positions=None):
+        """
+        :return: the columns at positions of a chunk, None reads all columns
+        """
+        columns = None if positions is None else [str(position) for position in positions]
+        df = self._cache.get(_chunk_key(chunk), columns=columns)
+        if df is None:
+            raise SpillEvictedError(
+                "Chunk {} of {} was removed from the disk cache, reload the file to convert it again".format(
+                    chunk, self.directory
+                )
+            )
+        df.index = pd.RangeIndex(self.offsets[chunk], self.offsets[chunk + 1])
+        df.columns = [self.names[int(position)] for position in df.columns]
+        return df
+
+    def iter_column(self, position):
+        """
+        :return: an iterator over the chunks of one column, indexed by their row position in the file
+        """
+        for chunk in range(self.n_chunks):
+            yield self._read(chunk, [position]).iloc[:, 0]
+
+    def head(self, n_rows=100):
+        return self._read(0).head(n_rows) if self.n_chunks else pd.DataFrame(columns=self.names)
+
+    def take(self, positions):
+        """
+        :param positions: row positions in any order
+        :return: the rows at the positions in that order, read one chunk at a time
+        """
+        positions = np.asarray(positions, dtype="int64")
+        chunks = np.searchsorted(self.offsets, positions, side="right") - 1
+        parts = [
+            self._read(chunk).loc[positions[chunks == chunk]] for chunk in np.unique(chunks)
+        ]
+        if not parts:
+            return self.head(0)
+        return pd.concat(parts).loc[positions]
+
+
+def _chunk_key(chunk):
+    return "chunk_{:06d}".format(chunk)
+
+
+def hash_spilled(spilled):
+    return spilled.directory
+
+
+# hash_funcs for the result cache: a spilled dataset is keyed on its directory, which follows from the file
+HASH_FUNCS = {SpilledFrame: hash_spilled}
+
+
+def profile_spilled(spilled, max_exact=4096, error=0.01):
+    """
+    :return: the DatasetProfile of the spilled dataset, computed one column at a time
+    """
+    columns = []
+    for position, name in enumerate(spilled.names):
+        accumulator = ColumnAccumulator(name, max_exact=max_exact, error=error)
+        for piece in spilled.iter_column(position):
+            accumulator.update(piece)
+        columns.append(accumulator.to_profile())
+    return DatasetProfile(columns, n_rows=len(spilled))
+
+
+def row_hashes(spilled, columns=None):
+    """
+    :param columns: the columns that are compared, None compares all columns
+    :return: one hash per row, equal to duplicates.RowHashIndex.row_hashes of the dataset in memory
+    """
+    selected = set(spilled.names if columns is None else columns)
+    hashes = np.zeros(len(spilled), dtype="uint64")
+    with np.errstate(over="ignore"):
+        for position, name in enumerate(spilled.names):
+            if name not in selected:
+                continue
+            # equal values hash equal also when their chunks were parsed with different dtypes
+            for piece in spilled.iter_column(position):
+                if not len(piece):
+                    continue
+                start, stop = piece.index[0], piece.index[-1] + 1
+                hashes[start:stop] = (hashes[start:stop] ^ hash_values(piece)) * _MULTIPLIER
+    return hashes
+
+
+def find_duplicates(spilled, columns=None, max_rows=1000):
+    """
+    :return: the DuplicateSummary of the columns and at most max_rows duplicate rows, grouped as
+    duplicates.RowHashIndex.rows groups them. The rows with equal hashes are compared value by value,
+    their columns are read once more.
+    """
+    hashes = row_hashes(spilled, columns)
+    positions = candidates(hashes)
+    selected = set(spilled.names if columns is None else columns)
+    values = (
+        _take_column(spilled, position, positions)
+        for position, name in enumerate(spilled.names)
+        if name in selected
+    )
+    keys = group_keys(hashes[positions], values)
+    return summarise(keys), spilled.take(positions[duplicate_groups(keys)][:max_rows])
+
+
+def _take_column(spilled, position, positions):
+    """
+    :return: the values of one column at the sorted row positions, only the chunks with such rows are read
+    """
+    bounds = np.searchsorted(positions, spilled.offsets)
+    pieces = [
+        spilled._read(chunk, [position]).iloc[:, 0].loc[positions[bounds[chunk] : bounds[chunk + 1]]]
+        for chunk in range(spilled.n_chunks)
+        if bounds[chunk] < bounds[chunk + 1]
+    ]
+    return pd.concat(pieces) if pieces else pd.Series([], dtype="object")
+
+
+def find_mixed_types(spilled, profile, n_examples=N_EXAMPLES):
+    """
+    :return: a MixedTypeColumn for every column with mixed data types, the same as
+    mixed_types.find_mixed_types of the dataset in memory. Chunks are read one at a time: the types of
+    all chunks are counted and the column is mixed when one value of every type is.
+    """
+    mixed = []
+    for position, name in enumerate(spilled.names):
+        if not ptypes.is_object_dtype(profile[name].dtype):
+            continue
+        type_counts, examples, representatives = Counter(), {}, {}
+        for piece in spilled.iter_column(position):
+            present = piece.dropna()
+            if not len(present):
+                continue
+            values = present.to_numpy(dtype="object")
+            codes, uniques = pd.factorize(_type_of(values))
+            for code, kind in enumerate(uniques):
+                matches = np.flatnonzero(codes == code)
+                type_name = kind.__name__
+                type_counts[type_name] += len(matches)
+                representatives.setdefault(type_name, values[matches[0]])
+                found = examples.setdefault(type_name, [])
+                found.extend(present.index[matches[: n_examples - len(found)]].tolist())
+        sample = pd.Series(list(representatives.values()), dtype="object")
+        if infer_dtype(sample) in MIXED_TYPES:
+            order = sorted(type_counts, key=type_counts.get, reverse=True)
+            mixed.append(
+                MixedTypeColumn(
+                    name=name,
+                    type_counts={type_name: type_counts[type_name] for type_name in order},
+                    examples={type_name: examples[type_name] for type_name in order},
+                )
+            )
+    return mixed
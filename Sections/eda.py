@@ -1,17 +1,17 @@
 import helpers
 import streamlit as st
+from Engine import aggregates, filters, plots
 import seaborn as sns
 import matplotlib.pyplot as plt
-from pandas import concat
 
 sns.set(style="darkgrid")
 sns.set(rc={"figure.figsize": (11.7, 9.27)})
 
 
-def first_inspection(df):
+def first_inspection(report):
     """
-    :param df: The loaded dataframe
-    :return:
+    :param report: the report graph of the loaded dataframe, see helpers.get_report
+    :return: the report graph of the filtered dataframe
     - Contains first look at the dataframe
     - Shows the number of rows and columns of the dataset
     - Shows the data characteristics (unique, missing, percent missing, zero, variable type)
@@ -33,48 +33,109 @@ def first_inspection(df):
     st.sidebar.subheader("By Numerical Values")
 
     # Show dataframe and a title in streamlit
-    float_names = helpers.get_numerical_names(df)
-    int_names = helpers.get_int_names(df)
+    float_names = report.get("numerical_names")
+    int_names = report.get("int_names")
     num_names = float_names + int_names
 
     column = st.sidebar.selectbox("Select a column to filter between a specific range", num_names)
-    min_value = float(df[column].min())
-    max_value = float(df[column].max())
+    # the sorted index is built once per column, the filters below are binary searches on it
+    sorted_index = report.get("sorted_index", column)
+    min_value = float(sorted_index.min)
+    max_value = float(sorted_index.max)
 
     choice_range = st.sidebar.radio("Select rows inside or outside a specified range", ['Inside', 'Outside'])
     helpers.innersection_space()
 
     values = st.sidebar.slider("Select a range of values", min_value, max_value, (min_value, max_value))
 
-    if st.sidebar.checkbox("Filter Data"):
+    # the filters select row positions, None selects all rows
+    rows = None
+    filtered = st.sidebar.checkbox("Filter Data")
+    if filtered:
         if choice_range == 'Inside':
-            df = df[df[column].between(values[0], values[1])]
+            rows = sorted_index.between(values[0], values[1])
             st.warning(":warning: **NA's** are filtered out as well.")
         elif choice_range == 'Outside':
-            df = df[~df[column].between(values[0], values[1])]
+            rows = sorted_index.outside(values[0], values[1])
 
         st.info(
             ":scissors: You are currently filtering on **{}**, where data is retained that is **{}** of the following range: "
             "`{}` and `{}`".format(column, choice_range.lower(), values[0], values[1]))
 
-    cat_names = helpers.get_categorical_names(df)
+    cat_names = report.get("categorical_names")
+    choice_column, choice_category = None, []
     if len(cat_names) != 0:
+        frame = report.get("frame")
         st.sidebar.markdown("")
         st.sidebar.subheader("By Category")
         choice_column = st.sidebar.selectbox("Select a categorical column to filter on", cat_names)
-        categories = df[choice_column].unique()
+        categories = filters.select(frame[choice_column], rows).unique()
         choice_category = st.sidebar.multiselect("Choose on or more categories from the selected variable", categories)
         if choice_category:
             # Filters by category
-            df = df[df[choice_column].isin(choice_category)]
+            rows = filters.isin(frame[choice_column], choice_category, rows)
 
+    # the filter state is the version of the selected rows, the nodes that depend on the rows are
+    # only computed again when it changes
+    state = None
+    if rows is not None:
+        state = (column, choice_range, values if filtered else None, choice_column, tuple(choice_category))
+    report = report.with_inputs(rows=(rows, state))
 
-    st.write(df)
+    # the statistics are computed on the selected rows, only the displayed data is copied
+    st.write(report.get("filtered"))
     # space within sections
     helpers.innersection_space()
 
+    # Preparation for EDA, all statistics come from one profile of the (filtered) data
+    data_characteristics(report.get("profile"))
+
+    st.sidebar.markdown("")
+
+
+    helpers.betweensection_space()
+
+    helpers.sidebar_space()
+
+    return report
+
+
+def first_inspection_spilled(profile, preview):
+    """
+    :param profile: the profile of a file that was converted to disk in chunks, see helpers.get_spilled_profile
+    :param preview: a dataframe with the first rows of the file
+    :return:
+    - Shows the first rows of the file
+    - Shows the number of rows and columns of the dataset
+    - Shows the data characteristics and the summary of numerical data of the full file
+    """
+
+    st.title(":mag_right: First Inspection")
+    st.info(
+        ":ocean: The file has been **converted to disk** in chunks, so the filters and visualizations "
+        "are not available. The statistics below are computed over the full file, one column at a time."
+    )
+
+    st.subheader("First Rows")
+    st.write(preview)
+    helpers.innersection_space()
+
+    data_characteristics(profile)
+
+    helpers.betweensection_space()
+
+
+def data_characteristics(profile):
+    """
+    :param profile: the DatasetProfile of the (filtered) data
+    :return:
+    - Shows the number of rows, columns and missing values
+    - Shows the data characteristics (unique, missing, percent missing, zero, variable type)
+    - Summary of numerical data (mean, std, min, max etc.)
+    """
+
     # Show Number
-    helpers.all_cards(df)
+    helpers.all_cards(profile)
 
     helpers.innersection_space()
 
@@ -83,26 +144,14 @@ def first_inspection(df):
         "Shows the number of **unique values**, the number of **missing values** and the **variable "
         "type** in Python for each variable in the dataset."
     )
+    if not all(column.n_unique_exact for column in profile):
+        st.markdown("Unique values of columns with many distinct values are **estimated**.")
 
-    # Preparation for EDA
-    unique_values = helpers.get_unique_values(df)
-    data_types = helpers.get_type_variables(df)
-    zero_values = helpers.get_zero_values(df)
-    missing_values, percent_missing = helpers.get_missings(df)
-
-    # Create table and highlight missing values
-    @st.cache
-    def get_summary_table(unique_values, missing_values, percent_missing, zero_values, data_types):
-        table = concat([unique_values, missing_values, percent_missing, zero_values, data_types],
-        axis=1,)
-        return table
+    # Table with the unique, missing, percentage missing and zero values and the type of each variable
+    summary_table = profile.summary_table()
 
-
-    summary_table = get_summary_table(unique_values, missing_values, percent_missing, zero_values, data_types)
-
-    # Gets the names of missing values, a dataframe with the missings, the number of rows/columns
-    # of the original df, and two tables with summary statistics
-    data_characteristics = helpers.describe_table(df)
+    # Summary statistics of the numerical data
+    numerical_summary = profile.describe()
 
     st.write(summary_table)
 
@@ -112,23 +161,19 @@ def first_inspection(df):
     st.markdown(
         "Shows the **count**, the **average** value, **lowest** and **highest** value for each variable"
     )
-    st.write(data_characteristics)
+    if not all(column.quantiles_exact for column in profile):
+        st.markdown("Quartiles of columns with many distinct values are **estimated** with a quantile sketch.")
+    st.write(numerical_summary)
 
     helpers.innersection_space()
 
-    st.sidebar.markdown("")
-
-
-    helpers.betweensection_space()
-
-    helpers.sidebar_space()
-
-    return df
-
-def visuals(df):
-    # create lists of column names
-    cat_names = helpers.get_categorical_names(df)
-    num_names = helpers.get_numerical_names(df)
+def visuals(report):
+    """
+    :param report: the report graph of the (filtered) dataframe, see first_inspection
+    """
+    # create lists of column names, copied as the second numerical choice removes a name
+    cat_names = list(report.get("categorical_names"))
+    num_names = list(report.get("numerical_names"))
 
     # Create list of options for visualizations
     options = []
@@ -160,49 +205,77 @@ def visuals(df):
     if len(num_names) > 1:
         num_names.remove(num_column)
 
+    num_column2 = None
+    if "Scatterplot" in choice_options:
+        num_column2 = st.sidebar.selectbox(
+            "Select a second numerical column for the scatterplot", num_names
+        )
+    hue_column = cat_column if len(cat_names) > 0 else None
+
+    # the figure is only drawn again when the (filtered) data or one of the choices above changed
+    key = (
+        report.version("filtered"),
+        tuple(choice_options),
+        num_column,
+        cat_column,
+        num_column2,
+    )
+    rendered = helpers.RENDER_CACHE.get_or_render(
+        key,
+        lambda: draw_visuals(report, choice_options, num_column, cat_column, num_column2, hue_column),
+    )
+    st.image(rendered, use_column_width=True)
+
+    return
+
+
+def draw_visuals(report, choice_options, num_column, cat_column, num_column2=None, hue_column=None):
+    """
+    :param report: the report graph of the (filtered) dataframe
+    :param choice_options: the visualizations to draw: "Histogram", "Boxplot", "Barplot" and "Scatterplot"
+    :return: the figure with the chosen visualizations, only drawn if it is not in the render cache
+    """
     fig = plt.figure()
     fig.subplots_adjust(hspace=0.3, wspace=0.3)
 
+    # the plots are drawn from aggregates, so their cost depends on the number of bins and groups
     if "Histogram" in choice_options:
-        fig.add_subplot(2, 2, 1)
-        sns.distplot(df[num_column].dropna())
+        ax = fig.add_subplot(2, 2, 1)
+        plots.histogram(ax, report.get("histogram", num_column), num_column)
 
     if "Boxplot" in choice_options:
         if "Histogram" in choice_options:
-            fig.add_subplot(2, 2, 2)
+            ax = fig.add_subplot(2, 2, 2)
         else:
-            fig.add_subplot(2, 2, 1)
-        sns.boxplot(cat_column, num_column, data=df)
+            ax = fig.add_subplot(2, 2, 1)
+        plots.boxplot(ax, report.get("box_stats", num_column, cat_column), cat_column, num_column)
 
     if "Barplot" in choice_options:
         if "Histogram" in choice_options and "Boxplot" in choice_options:
-            fig.add_subplot(2, 2, 3)
+            ax = fig.add_subplot(2, 2, 3)
         elif len(choice_options) == 2 and "Boxplot" in choice_options:
-            fig.add_subplot(2, 2, 2)
+            ax = fig.add_subplot(2, 2, 2)
         elif len(choice_options) == 2 and "Histogram" in choice_options:
-            fig.add_subplot(2, 2, 2)
+            ax = fig.add_subplot(2, 2, 2)
         elif len(choice_options) == 3:
-            fig.add_subplot(2, 2, 2)
+            ax = fig.add_subplot(2, 2, 2)
         else:
-            fig.add_subplot(2, 2, 1)
-        sns.countplot(x=cat_column, data=df)
+            ax = fig.add_subplot(2, 2, 1)
+        plots.countplot(ax, report.get("category_counts", cat_column), cat_column)
 
     if "Scatterplot" in choice_options:
-        num_column2 = st.sidebar.selectbox(
-            "Select a second numerical column for the scatterplot", num_names
-        )
         # Position for scatterplot is always last
         # so it just depends on the length of the chosen options
         for i in range(1, 4):
             if len(choice_options) == i + 1:
                 fig.add_subplot(2, 2, i + 1)
+        ax = fig.gca()
 
-        if len(cat_names) > 0:
-            sns.scatterplot(x=num_column, y=num_column2, hue=cat_column, data=df)
+        df = report.get("filtered")
+        if len(df) > aggregates.RASTER_MIN_POINTS:
+            # one marker per row is unreadable and slow for many rows, draw the density instead
+            raster = report.get("density_raster", num_column, num_column2, hue_column)
+            plots.density_scatterplot(ax, raster, num_column, num_column2, hue_column)
         else:
-            sns.scatterplot(x=num_column, y=num_column2, data=df)
-    st.pyplot()
-
-
-
-    return
+            sns.scatterplot(x=num_column, y=num_column2, hue=hue_column, data=df, ax=ax)
+    return fig
@@ -1,18 +1,38 @@
 import streamlit as st
 import helpers
+from Engine import metrics
 from Text import text_markdown
-from pandas.api.types import infer_dtype
-from pandas import concat
 
 
-def preprocess(df):
+def preprocess(report):
     """
     Gives different preprocessing Suggestions based on the input dataframe
+    :param report: the report graph of the (filtered) dataframe, see eda.first_inspection
     """
 
     st.title(":newspaper: Additional Information")
     st.sidebar.title(":newspaper: Additional Information")
 
+    # the rows are hashed when the selected columns are first summarised
+    row_hash_index = report.get("row_hashes")
+    duplicates_section(report.get("all_names"), row_hash_index.summary, row_hash_index.rows)
+
+    mixed_types_section(report.get("mixed_types"))
+
+    # see if any data is missing
+    missing_values_section(report.get("missing_verdicts"))
+
+    return
+
+
+def duplicates_section(all_names, summarise, rows):
+    """
+    Shows the duplicate rows for the columns selected in the sidebar
+    :param all_names: all the column names
+    :param summarise: a function of the selected columns that returns a DuplicateSummary, see Engine/duplicates.py
+    :param rows: a function of the selected columns that returns the duplicate rows
+    """
+
     st.subheader("Duplicates")
     st.markdown("You can check your data for duplicates. By default **all columns** are selected in the "
                 "sidebar :point_left:, which implies "
@@ -21,53 +41,79 @@ def preprocess(df):
                 "will be displayed containing the rows which are duplicates when only considering the selected columns.")
 
     st.sidebar.subheader("Duplicates")
-    all_names = helpers.get_all_names(df)
     choice_duplicates = st.sidebar.multiselect("Select the column that you want to check for duplicates", all_names,
                                                all_names)
 
     if len(choice_duplicates) != 0:
-        try:
-            # returns dataframe that contains duplicates in a column/columns
-            # duplicate_df = df[df[choice_duplicates].duplicated() == True].sort_values(choice_duplicates)
-            duplicate_df = concat(g for _, g in df.groupby(choice_duplicates) if len(g) > 1)
-            if len(duplicate_df) != 0:
-                st.write(duplicate_df)
-            else:
-                st.success(":heavy_check_mark: There are no duplicate rows for the selected columns")
-        except ValueError:
+        # returns dataframe that contains duplicates in a column/columns
+        with metrics.time_section("duplicates"):
+            duplicates = summarise(choice_duplicates)
+        if duplicates.n_rows != 0:
+            st.warning(
+                ":warning: **{:,d}** rows are duplicates, in **{:,d}** groups. The largest group has "
+                "**{:,d}** rows.".format(duplicates.n_rows, duplicates.n_groups, duplicates.largest_group)
+            )
+            st.write(rows(choice_duplicates))
+        else:
             st.success(":heavy_check_mark: There are no duplicate rows for the selected columns")
 
 
+def mixed_types_section(mixed_types):
+    """
+    Shows the columns with mixed data types
+    :param mixed_types: a MixedTypeColumn for each column with mixed data types, see Engine/mixed_types.py
+    """
+
     st.subheader("Mixed datatypes")
     st.markdown("Shows the columns which contain a mix of data types. For example, a column with both "
                 "numerical values and strings.")
 
-    @st.cache
-    def is_mixed(col):
-        return infer_dtype(col) in ['mixed', 'mixed-integer']
-
-    mixed_types = df.apply(is_mixed)
-    mixed_types = mixed_types.loc[mixed_types == 1].reset_index()
-    list_mixed_types = mixed_types['index'].tolist()
-    mixed_string = ", ".join(list_mixed_types)
+    mixed_string = ", ".join(str(column.name) for column in mixed_types)
 
     if len(mixed_string) > 0:
         st.warning(
             ":warning: The column **{}** has mixed data types.".format(mixed_string)
         )
+        for column in mixed_types:
+            st.markdown("The number of values and example rows of each type in **{}**:".format(column.name))
+            st.write(column.to_frame())
     elif len(mixed_string) == 0:
         st.success(":heavy_check_mark: There are no columns with mixed data types.")
 
 
-    # Call function to see if any data is missing
-    (
-        missing_values,
-        only_missings_df,
-        percent_missing,
-        missing_values_names,
-    ) = helpers.get_missing_values(df)
+def preprocess_spilled(spilled):
+    """
+    The suggestions for a file that was converted to disk, the checks read it one column at a time
+    :param spilled: the file on disk, see helpers.load_spilled
+    """
+
+    st.title(":newspaper: Additional Information")
+    st.sidebar.title(":newspaper: Additional Information")
+
+    def summarise(columns):
+        return helpers.get_spilled_duplicates(spilled, tuple(columns))[0]
+
+    def rows(columns):
+        duplicate_rows = helpers.get_spilled_duplicates(spilled, tuple(columns))[1]
+        if len(duplicate_rows) == helpers.MAX_SPILLED_DUPLICATES:
+            st.info("Only the first {:,d} duplicate rows are shown.".format(helpers.MAX_SPILLED_DUPLICATES))
+        return duplicate_rows
+
+    duplicates_section(spilled.names, summarise, rows)
+
+    mixed_types_section(helpers.get_spilled_mixed_types(spilled))
+
+    profile = helpers.get_spilled_profile(spilled)
+    missing_values_section(helpers.is_data_missing(None, profile.percent_missing()))
+
 
-    still_missing, messages, type = helpers.is_data_missing(df, percent_missing)
+def missing_values_section(verdicts):
+    """
+    Gives suggestions on how to deal with the missing values
+    :param verdicts: the columns that are still missing, the messages and their types, see helpers.is_data_missing
+    """
+
+    still_missing, messages, type = verdicts
 
     st.subheader("Missing Values")
     st.markdown("Shows information on the missing values and how to deal with those.")
@@ -85,8 +131,3 @@ def preprocess(df):
             text_markdown.missings_recommendation()
     else:
         st.success(messages)
-
-
-
-
-    return
@@ -54,10 +54,10 @@ def intro_page():
 
     st.markdown(
         """
-    This tool :heavy_check_mark: checks and :chart_with_upwards_trend: visualizes any `excel` or `csv` file that you upload, which makes it a great way to 
+    This tool :heavy_check_mark: checks and :chart_with_upwards_trend: visualizes any `excel`, `csv`, `parquet` or `arrow` file that you upload, which makes it a great way to 
     quickly get a sense of the data that you are dealing with.
 
-    👈 **Please _upload a csv or excel file_ in the sidebar to explore your own dataset.**
+    👈 **Please _upload a csv, excel, parquet or arrow file_ in the sidebar to explore your own dataset.**
     """
     )
 
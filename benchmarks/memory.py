@@ -0,0 +1,277 @@
+"""
+Peak memory of loading and profiling, with a regression check against stored baselines
+
+Every scenario runs in a fresh process on synthetic data, see benchmarks/synthetic.py. It records the
+growth of the peak resident memory (RSS) while the scenario runs, and in a second process the peak
+of the memory traced by tracemalloc, which counts the Python and numpy allocations exactly.
+
+Store a baseline, then check a change against it:
+
+    python -m benchmarks.memory --rows 100000 1000000 --save-baseline benchmarks/memory_baseline.json
+    python -m benchmarks.memory --rows 100000 1000000 --baseline benchmarks/memory_baseline.json --threshold 10
+
+The check exits with status 1 when a peak grew by more than the threshold percentage for the same input.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate
+
+DEFAULT_ROWS = [100_000, 1_000_000]
+
+# the same mix and cardinality as the timing benchmarks, see benchmarks/suite.py
+DTYPE_MIX = {"float": 4, "int": 2, "category": 2, "text": 1, "mixed": 1}
+CARDINALITY = 8
+
+# growth below this many bytes is noise and never counts as a regression
+MIN_REGRESSION_BYTES = 4 * 1024 * 1024
+
+
+def _status_bytes(field):
+    """
+    :return: a field of /proc/self/status in bytes, None where it does not exist
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident memory of this process to its current size, which Linux supports
+    :return: whether the peak was reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def current_rss():
+    rss = _status_bytes("VmRSS")
+    return rss if rss is not None else peak_rss()
+
+
+def peak_rss():
+    peak = _status_bytes("VmHWM")
+    if peak is not None:
+        return peak
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Inputs:
+    """
+    The files a scenario starts from: the csv file, the dataframe as a pickle and a disk cache with the parsed file
+    """
+
+    def __init__(self, n_rows, n_columns, directory, seed=0):
+        df = generate(n_rows, n_columns, DTYPE_MIX, cardinality=CARDINALITY, seed=seed)
+        self.csv = os.path.join(directory, "synthetic_{}.csv".format(n_rows))
+        self.frame = os.path.join(directory, "synthetic_{}.pkl".format(n_rows))
+        self.cache_dir = os.path.join(directory, "cache")
+        df.to_csv(self.csv, index=False)
+        df.to_pickle(self.frame)
+
+        from Engine import disk_cache, readers, sniff
+
+        file_format = sniff.sniff(self.csv)
+        self.key = disk_cache.cache_key(disk_cache.content_digest(self.csv), file_format)
+        disk_cache.DiskCache(self.cache_dir).get_or_load(
+            self.key, lambda: readers.read_file(self.csv, file_format)
+        )
+
+
+def _prepare(scenario, inputs):
+    """
+    :return: a function without arguments that runs the scenario, its inputs are loaded beforehand
+    """
+    import helpers
+    from Engine import disk_cache, readers, sniff
+    from Engine.duplicates import RowHashIndex
+    from Engine.handle import DatasetHandle
+    from Engine.mixed_types import find_mixed_types
+
+    if scenario == "load_file":
+        file_format = sniff.sniff(inputs.csv)
+        return lambda: readers.read_file(inputs.csv, file_format)
+    if scenario == "load_file_cached":
+        cache = disk_cache.DiskCache(inputs.cache_dir)
+        return lambda: cache.get(inputs.key)
+
+    df = pd.read_pickle(inputs.frame)
+    handle = DatasetHandle.from_frame(df)
+    if scenario == "profile":
+        return lambda: (helpers.summary_table(handle), helpers.describe_table(handle))
+    if scenario == "categories":
+        return lambda: helpers.get_report(handle).get("frame")
+    if scenario == "duplicates":
+        return lambda: RowHashIndex(df).summary(list(df.columns))
+    if scenario == "mixed_types":
+        return lambda: find_mixed_types(df)
+    raise ValueError("Unknown scenario: {}".format(scenario))
+
+
+SCENARIOS = ["load_file", "load_file_cached", "profile", "categories", "duplicates", "mixed_types"]
+
+
+def _measure(scenario, inputs, traced, queue):
+    """
+    Run the scenario in this process and put the peak it reached on the queue
+    """
+    run = _prepare(scenario, inputs)
+    if traced:
+        tracemalloc.start()
+        result = run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        before = current_rss()
+        if not reset_peak_rss():
+            before = peak_rss()
+        result = run()
+        peak = max(peak_rss() - before, 0)
+    del result
+    queue.put(peak)
+
+
+def measure(scenario, inputs, traced):
+    """
+    :return: the peak in bytes of the scenario in a fresh process
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(scenario, inputs, traced, queue))
+    process.start()
+    peak = queue.get()
+    process.join()
+    return peak
+
+
+def run(rows, n_columns=20, scenarios=None, seed=0):
+    """
+    :return: a list with the peaks of every scenario on every dataset size
+    """
+    scenarios = scenarios or SCENARIOS
+    results = []
+    directory = tempfile.mkdtemp(prefix="dqc_memory_")
+    try:
+        for n_rows in rows:
+            inputs = Inputs(n_rows, n_columns, directory, seed)
+            for scenario in scenarios:
+                result = {
+                    "scenario": scenario,
+                    "rows": n_rows,
+                    "columns": n_columns,
+                    "peak_rss_bytes": measure(scenario, inputs, traced=False),
+                    "tracemalloc_peak_bytes": measure(scenario, inputs, traced=True),
+                }
+                results.append(result)
+                print(
+                    "{:<18} {:>12,d} rows {:>10.1f} MB RSS {:>10.1f} MB traced".format(
+                        scenario,
+                        n_rows,
+                        result["peak_rss_bytes"] / 1e6,
+                        result["tracemalloc_peak_bytes"] / 1e6,
+                    ),
+                    flush=True,
+                )
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": sys.platform,
+    }
+
+
+def regressions(results, baseline, threshold, min_bytes=MIN_REGRESSION_BYTES):
+    """
+    :param results: the peaks of this run
+    :param baseline: the peaks of the baseline, scenarios that are not in both are skipped
+    :param threshold: the percentage a peak may grow
+    :param min_bytes: growth below this many bytes is never a regression
+    :return: a list with a message for every peak that grew by more than the threshold
+    """
+    stored = {(result["scenario"], result["rows"], result["columns"]): result for result in baseline}
+    messages = []
+    for result in results:
+        before = stored.get((result["scenario"], result["rows"], result["columns"]))
+        if before is None:
+            continue
+        for metric in ("peak_rss_bytes", "tracemalloc_peak_bytes"):
+            growth = result[metric] - before[metric]
+            if growth > min_bytes and growth > before[metric] * threshold / 100:
+                messages.append(
+                    "{} with {:,d} rows: {} grew from {:,.1f} MB to {:,.1f} MB".format(
+                        result["scenario"],
+                        result["rows"],
+                        metric,
+                        before[metric] / 1e6,
+                        result[metric] / 1e6,
+                    )
+                )
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=None, help="default all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-baseline", default=None, help="write the peaks to this JSON file")
+    parser.add_argument("--baseline", default=None, help="check the peaks against this JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="the percentage a peak may grow"
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.columns, args.scenarios, args.seed)
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w") as file:
+            json.dump({"environment": environment(), "results": results}, file, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["environment"] != environment():
+            print(
+                "The baseline was measured with {}, the peaks may differ for other versions".format(
+                    baseline["environment"]
+                )
+            )
+        messages = regressions(results, baseline["results"], args.threshold)
+        for message in messages:
+            print(message)
+        if messages:
+            sys.exit(1)
+        print("No peak grew by more than {}%".format(args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark of the parallel column profiling on a wide synthetic table
+
+Compares the serial summary table, as the application computed it before the profiling engine
+(nunique, isnull().sum() and isin([0]) per column), with the serial profile and with the parallel
+profile on threads and processes:
+
+    python -m benchmarks.parallel_profile --rows 10000 --columns 2000 --workers 1 2 4 8
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from Engine.parallel import default_workers, profile_frame
+from Engine.profile import DatasetProfile
+
+
+def wide_frame(n_rows, n_columns, seed=0):
+    """
+    :return: a dataframe with float, integer and string columns in equal parts, with some missing values
+    """
+    rng = np.random.RandomState(seed)
+    columns = {}
+    for position in range(n_columns):
+        kind = position % 3
+        if kind == 0:
+            values = rng.normal(size=n_rows)
+            values[rng.rand(n_rows) < 0.05] = np.nan
+        elif kind == 1:
+            values = rng.randint(0, 1000, size=n_rows)
+        else:
+            values = rng.choice(["a", "b", "c", "d", ""], size=n_rows).astype(object)
+        columns["column_{}".format(position)] = values
+    return pd.DataFrame(columns)
+
+
+def legacy_summary_table(df):
+    """
+    The summary table as it was computed with one pandas call per statistic
+    """
+    unique_values = df.nunique().to_frame("Unique Values")
+    missing_values = df.isnull().sum().to_frame("Missing Values")
+    percent_missing = (df.isnull().sum() * 100 / len(df)).to_frame("Percent Missing")
+    zero_values = df.isin([0]).sum().to_frame("Zero Values")
+    data_types = df.dtypes.to_frame("Variable Type")
+    return pd.concat(
+        [unique_values, missing_values, percent_missing, zero_values, data_types], axis=1
+    )
+
+
+def timed(function, repeat):
+    """
+    :return: the fastest of repeat runs, in seconds
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(n_rows, n_columns, workers, repeat=3):
+    df = wide_frame(n_rows, n_columns)
+    results = [
+        ("legacy summary_table", 1, timed(lambda: legacy_summary_table(df), repeat)),
+        (
+            "serial profile",
+            1,
+            timed(lambda: DatasetProfile.from_frame(df).summary_table(), repeat),
+        ),
+    ]
+    for executor in ("thread", "process"):
+        for n_workers in workers:
+            seconds = timed(
+                lambda: profile_frame(df, workers=n_workers, executor=executor).summary_table(),
+                repeat,
+            )
+            results.append(("{} profile".format(executor), n_workers, seconds))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, default=2_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=sorted({2, 4, default_workers()})
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.columns, args.workers, args.repeat)
+    baseline = results[0][2]
+    print("{:,d} rows x {:,d} columns, {} cores".format(args.rows, args.columns, default_workers()))
+    print("{:<24} {:>8} {:>10} {:>9}".format("method", "workers", "seconds", "speedup"))
+    for method, n_workers, seconds in results:
+        print(
+            "{:<24} {:>8} {:>10.3f} {:>8.1f}x".format(method, n_workers, seconds, baseline / seconds)
+        )
+
+
+if __name__ == "__main__":
+    main()
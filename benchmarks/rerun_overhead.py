@@ -0,0 +1,102 @@
+"""
+Benchmark of the overhead of a rerun before any cached result is used
+
+Every rerun of the application looks up its cached results again. Keyed on the dataframe, each lookup
+hashes the data: st.cache hashes every dataframe argument (a sample of 100,000 rows for larger frames)
+and the report graph used a fingerprint of the full data as its version. Keyed on the token of a
+DatasetHandle, a lookup hashes a short string:
+
+    python -m benchmarks.rerun_overhead --rows 1000000 --columns 20 --calls 12
+"""
+import argparse
+import hashlib
+import pickle
+
+import pandas as pd
+
+from Engine.handle import DatasetHandle
+from Engine.render_cache import fingerprint
+from Engine.report import build_graph
+from benchmarks.parallel_profile import timed, wide_frame
+
+# st.cache hashes a sample of this many rows of larger dataframes
+STREAMLIT_SAMPLE_ROWS = 100_000
+
+# the nodes a rerun of the report asks for
+REPORT_NODES = ["numerical_names", "categorical_names", "summary_table", "describe", "missing_verdicts"]
+
+
+def streamlit_hash(df):
+    """
+    The bytes st.cache hashes for a dataframe argument
+    """
+    if len(df) >= STREAMLIT_SAMPLE_ROWS:
+        df = df.sample(n=STREAMLIT_SAMPLE_ROWS, random_state=0)
+    try:
+        value = b"%s" % pd.util.hash_pandas_object(df).sum()
+    except TypeError:
+        value = pickle.dumps(df, pickle.HIGHEST_PROTOCOL)
+    return hashlib.md5(value).digest()
+
+
+def token_hash(handle):
+    """
+    The bytes st.cache hashes for a handle argument, see Engine.handle.HASH_FUNCS
+    """
+    return hashlib.md5(handle.token.encode("utf-8")).digest()
+
+
+def report_rerun(graph, df, version):
+    evaluation = graph.bind(data=(df, version), rows=(None, None), token=(version, version))
+    for name in REPORT_NODES:
+        evaluation.get(name)
+
+
+def run(n_rows, n_columns, calls, repeat=5):
+    df = wide_frame(n_rows, n_columns)
+    handle = DatasetHandle.from_frame(df)
+    graph = build_graph(workers=1)
+    # the results are computed once, the reruns below only look them up
+    report_rerun(graph, df, handle.token)
+    report_rerun(graph, df, fingerprint(df))
+
+    def keyed_on_data():
+        for _ in range(calls):
+            streamlit_hash(df)
+        report_rerun(graph, df, fingerprint(df))
+
+    def keyed_on_token():
+        for _ in range(calls):
+            token_hash(handle)
+        report_rerun(graph, df, handle.token)
+
+    return [
+        ("keyed on the data", timed(keyed_on_data, repeat)),
+        ("keyed on the token", timed(keyed_on_token, repeat)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument(
+        "--calls", type=int, default=12, help="the number of cached helper calls per rerun"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.columns, args.calls, args.repeat)
+    baseline = results[0][1]
+    print(
+        "{:,d} rows x {:,d} columns, {} cached calls per rerun".format(
+            args.rows, args.columns, args.calls
+        )
+    )
+    print("{:<24} {:>12} {:>9}".format("method", "ms per rerun", "speedup"))
+    for method, seconds in results:
+        print("{:<24} {:>12.2f} {:>8.1f}x".format(method, seconds * 1000, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Benchmarks of the helpers and sections on synthetic data
+
+Every benchmark runs on datasets of the given sizes, see benchmarks/synthetic.py, and the results are
+written to a JSON file. Passing an earlier file with --compare prints how much faster or slower every
+benchmark became:
+
+    python -m benchmarks.suite --rows 10000 1000000 10000000 --output after.json --compare before.json
+
+The cached helpers are timed without their cache: the result cache is cleared before every run.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import helpers
+from Engine import disk_cache, readers, sniff
+from Engine.duplicates import RowHashIndex
+from Engine.handle import DatasetHandle
+from Engine.mixed_types import find_mixed_types
+from Engine.parallel import default_workers
+from Engine.render_cache import render_png
+from Sections import eda
+from benchmarks.synthetic import generate
+
+DEFAULT_ROWS = [10_000, 1_000_000, 10_000_000]
+
+# the mix of the synthetic data: numerical columns for the histogram and scatterplot, categories for
+# the boxplot and barplot, and text and mixed columns for the mixed type check
+DTYPE_MIX = {"float": 4, "int": 2, "category": 2, "text": 1, "mixed": 1}
+
+# the number of levels of the category columns, few enough to be shown as categories
+CARDINALITY = 8
+
+VISUALS = ["Histogram", "Boxplot", "Barplot", "Scatterplot"]
+
+
+class Dataset:
+    """
+    A synthetic dataset, written to a csv file for the load benchmarks
+    """
+
+    def __init__(self, n_rows, n_columns, directory, seed=0):
+        self.df = generate(n_rows, n_columns, DTYPE_MIX, cardinality=CARDINALITY, seed=seed)
+        self.handle = DatasetHandle.from_frame(self.df)
+        self.path = os.path.join(directory, "synthetic_{}.csv".format(n_rows))
+        self.df.to_csv(self.path, index=False)
+        self.file_format = sniff.sniff(self.path)
+        self.cache = disk_cache.DiskCache(os.path.join(directory, "cache"))
+        self.key = disk_cache.cache_key(disk_cache.content_digest(self.path), self.file_format)
+        self.percent_missing = self.df.isnull().mean().mul(100).to_frame("Percent Missing")
+
+
+def load_file(data):
+    """
+    Parse the csv file, as helpers.load_file does for a new upload
+    """
+    return readers.read_file(data.path, data.file_format)
+
+
+def load_cached_file(data):
+    """
+    Read the parsed csv file from the disk cache, as helpers.load_file does for a known upload
+    """
+    return data.cache.get_or_load(data.key, lambda: load_file(data))
+
+
+def summary_table(data):
+    return helpers.summary_table(data.handle)
+
+
+def describe_table(data):
+    return helpers.describe_table(data.handle)
+
+
+def is_data_missing(data):
+    return helpers.is_data_missing(data.df, data.percent_missing)
+
+
+def duplicates(data):
+    return RowHashIndex(data.df).summary(list(data.df.columns))
+
+
+def mixed_types(data):
+    return find_mixed_types(data.df)
+
+
+def visuals(data):
+    """
+    Compute the aggregates of all visualizations, draw them and render the figure
+    """
+    report = helpers.get_report(data.handle)
+    num_names = report.get("numerical_names")
+    cat_column = report.get("categorical_names")[0]
+    fig = eda.draw_visuals(report, VISUALS, num_names[0], cat_column, num_names[1], cat_column)
+    rendered = render_png(fig)
+    plt.close(fig)
+    return rendered
+
+
+BENCHMARKS = {
+    "load_file": load_file,
+    "load_file_cached": load_cached_file,
+    "summary_table": summary_table,
+    "describe_table": describe_table,
+    "is_data_missing": is_data_missing,
+    "duplicates": duplicates,
+    "mixed_types": mixed_types,
+    "visuals": visuals,
+}
+
+
+def measure(function, data, repeat):
+    """
+    :return: the seconds of every run, the result cache is cleared before each one
+    """
+    seconds = []
+    for _ in range(repeat):
+        helpers.RESULT_CACHE.clear()
+        start = time.perf_counter()
+        function(data)
+        seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def run(rows, n_columns=20, names=None, repeat=3, seed=0):
+    """
+    :return: a list with the result of every benchmark on every dataset size
+    """
+    names = names or list(BENCHMARKS)
+    results = []
+    directory = tempfile.mkdtemp(prefix="dqc_benchmarks_")
+    try:
+        for n_rows in rows:
+            data = Dataset(n_rows, n_columns, directory, seed)
+            load_cached_file(data)
+            for name in names:
+                seconds = measure(BENCHMARKS[name], data, repeat)
+                results.append(
+                    {
+                        "benchmark": name,
+                        "rows": n_rows,
+                        "columns": n_columns,
+                        "repeat": repeat,
+                        "best_seconds": min(seconds),
+                        "median_seconds": float(np.median(seconds)),
+                    }
+                )
+                print(
+                    "{:<18} {:>12,d} rows {:>10.3f} s".format(name, n_rows, min(seconds)),
+                    flush=True,
+                )
+            del data
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cores": default_workers(),
+    }
+
+
+def compare(results, baseline):
+    """
+    :param results: the results of this run
+    :param baseline: the results of an earlier run
+    :return: a dataframe with the best seconds of both runs and the speedup of every benchmark
+    """
+    columns = ["benchmark", "rows", "best_seconds"]
+    merged = pd.merge(
+        pd.DataFrame(baseline)[columns],
+        pd.DataFrame(results)[columns],
+        on=["benchmark", "rows"],
+        suffixes=(" before", " after"),
+    )
+    merged["speedup"] = merged["best_seconds before"] / merged["best_seconds after"]
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=None, help="default all"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmarks.json")
+    parser.add_argument("--compare", default=None, help="the JSON file of an earlier run")
+    args = parser.parse_args(argv)
+
+    # the figures are rendered to PNG without a display
+    plt.switch_backend("Agg")
+    results = run(args.rows, args.columns, args.benchmarks, args.repeat, args.seed)
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "environment": environment(),
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        print(compare(results, baseline).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
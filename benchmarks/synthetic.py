@@ -0,0 +1,145 @@
+"""
+Deterministic synthetic datasets for the benchmarks
+
+The same parameters always give the same data, and every column only depends on its own position,
+so adding columns leaves the other columns as they are. To write a dataset to a file:
+
+    python -m benchmarks.synthetic data.csv --rows 1000000 --columns 20 --missing-ratio 0.1
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+KINDS = ("float", "int", "category", "text", "bool", "datetime", "mixed")
+
+# the share of every kind of column when no mix is given
+DEFAULT_MIX = {"float": 4, "int": 3, "category": 2, "text": 1}
+
+
+def column_kinds(n_columns, dtype_mix=None):
+    """
+    :param dtype_mix: a dict with the relative number of columns of every kind, see KINDS
+    :return: the kind of every column, the kinds take turns so that any number of columns has a mix
+    """
+    dtype_mix = dtype_mix or DEFAULT_MIX
+    unknown = set(dtype_mix) - set(KINDS)
+    if unknown:
+        raise ValueError("Unknown kinds of columns: {}".format(", ".join(sorted(unknown))))
+    kinds = [kind for kind, weight in dtype_mix.items() for _ in range(weight)]
+    return [kinds[position % len(kinds)] for position in range(n_columns)]
+
+
+def _column(kind, n_rows, cardinality, rng):
+    if kind == "float":
+        return rng.normal(loc=rng.uniform(-100, 100), scale=rng.uniform(1, 50), size=n_rows)
+    if kind == "int":
+        return rng.randint(0, 1_000_000, size=n_rows)
+    if kind == "category":
+        levels = np.array(["level_{}".format(level) for level in range(cardinality)], dtype=object)
+        return levels[rng.randint(0, cardinality, size=n_rows)]
+    if kind == "text":
+        return pd.Series(rng.randint(0, 2 ** 62, size=n_rows, dtype="int64")).map("{:x}".format).to_numpy()
+    if kind == "bool":
+        return rng.rand(n_rows) < 0.5
+    if kind == "datetime":
+        seconds = rng.randint(0, 10 * 365 * 24 * 3600, size=n_rows)
+        return np.datetime64("2010-01-01") + seconds.astype("timedelta64[s]")
+    # numbers with some strings in between, as in a column that was typed by hand
+    values = rng.randint(0, cardinality, size=n_rows).astype(object)
+    strings = rng.rand(n_rows) < 0.1
+    values[strings] = np.array(["n/a", "unknown", "-"], dtype=object)[rng.randint(0, 3, size=strings.sum())]
+    return values
+
+
+def _with_missing(values, missing_ratio, rng):
+    missing = rng.rand(len(values)) < missing_ratio
+    if not missing.any():
+        return values
+    if values.dtype.kind == "f":
+        values[missing] = np.nan
+    elif values.dtype.kind == "M":
+        values[missing] = np.datetime64("NaT")
+    elif values.dtype == object:
+        values[missing] = None
+    else:
+        # integer and boolean columns become float and object columns with missing values, as pandas reads them
+        values = pd.Series(values).where(~missing).to_numpy()
+    return values
+
+
+def generate(
+    n_rows,
+    n_columns=20,
+    dtype_mix=None,
+    missing_ratio=0.05,
+    cardinality=50,
+    duplicate_ratio=0.01,
+    seed=0,
+):
+    """
+    :param n_rows: the number of rows
+    :param n_columns: the number of columns
+    :param dtype_mix: the relative number of columns of every kind, see column_kinds
+    :param missing_ratio: the share of missing values in every column, integer columns stay complete
+    :param cardinality: the number of distinct values of the category and mixed columns
+    :param duplicate_ratio: the share of rows that copies another row
+    :param seed: the seed of the random numbers
+    :return: a dataframe
+    """
+    duplicates_rng = np.random.RandomState(seed)
+    n_duplicates = int(duplicate_ratio * n_rows)
+    targets = duplicates_rng.choice(n_rows, n_duplicates, replace=False)
+    sources = duplicates_rng.randint(0, n_rows, size=n_duplicates)
+
+    columns = {}
+    for position, kind in enumerate(column_kinds(n_columns, dtype_mix)):
+        rng = np.random.RandomState([seed, position + 1])
+        values = _column(kind, n_rows, cardinality, rng)
+        if kind != "int":
+            values = _with_missing(values, missing_ratio, rng)
+        values[targets] = values[sources]
+        columns["{}_{}".format(kind, position)] = values
+    return pd.DataFrame(columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output", help="a .csv, .parquet or .feather file")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        default=None,
+        metavar="KIND=WEIGHT",
+        help="the relative number of columns of every kind, e.g. float=2 text=1",
+    )
+    parser.add_argument("--missing-ratio", type=float, default=0.05)
+    parser.add_argument("--cardinality", type=int, default=50)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    dtype_mix = None
+    if args.mix:
+        dtype_mix = {kind: int(weight) for kind, weight in (item.split("=") for item in args.mix)}
+    df = generate(
+        args.rows,
+        args.columns,
+        dtype_mix,
+        args.missing_ratio,
+        args.cardinality,
+        args.duplicate_ratio,
+        args.seed,
+    )
+    if args.output.endswith(".parquet"):
+        df.to_parquet(args.output)
+    elif args.output.endswith((".feather", ".arrow")):
+        df.to_feather(args.output)
+    else:
+        df.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
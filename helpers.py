@@ -1,178 +1,381 @@
-import pandas as pd
 import streamlit as st
 import io
+import os
+import weakref
 from pandas.io.parsers import ParserError
 from datetime import datetime
 
+from Engine import (
+    checks,
+    disk_cache,
+    excel,
+    metrics,
+    parallel,
+    readers,
+    render_cache,
+    report,
+    result_cache,
+    sniff,
+    spill,
+)
+from Engine.dtypes import optimise_dtypes
+from Engine.handle import HASH_FUNCS, DatasetHandle
+
+
+# Datasets with at least this many rows get estimated unique values for columns with many
+# distinct values, with the given relative error. Small counts are always exact.
+APPROXIMATE_DISTINCT_ROWS = int(os.environ.get("DQC_APPROXIMATE_DISTINCT_ROWS", 1_000_000))
+DISTINCT_ERROR = float(os.environ.get("DQC_DISTINCT_ERROR", 0.01))
+
+# The columns are profiled by this many workers ("thread" or "process"), by default one per core
+PROFILE_WORKERS = int(os.environ.get("DQC_PROFILE_WORKERS", parallel.default_workers()))
+PROFILE_EXECUTOR = os.environ.get("DQC_PROFILE_EXECUTOR", "thread")
+
+# The full columns are checked for mixed types by this many workers of the same kind, by default serially,
+# see Engine/mixed_types.py for the timings
+MIXED_TYPE_WORKERS = int(os.environ.get("DQC_MIXED_TYPE_WORKERS", 1))
+
+# Parsed csv and excel files are kept on disk, so they survive restarts of the application,
+# up to this budget, the least recently used go first
+DISK_CACHE = disk_cache.DiskCache(
+    max_bytes=int(os.environ.get("DQC_DISK_CACHE_MB", 10 * 1024)) * 1024 * 1024
+)
+
+# the number of duplicate rows of a spilled file that is shown, the rows are read back from disk
+MAX_SPILLED_DUPLICATES = 1000
+
+# Rendered figures are kept in memory up to this budget, the least recently used go first
+RENDER_CACHE = render_cache.RenderCache(
+    max_bytes=int(os.environ.get("DQC_RENDER_CACHE_MB", 64)) * 1024 * 1024
+)
+
+# The results of the helpers and the report are kept in memory up to this budget, the least recently used go first
+RESULT_CACHE = result_cache.ResultCache(
+    max_bytes=int(os.environ.get("DQC_RESULT_CACHE_MB", 512)) * 1024 * 1024
+)
+
+# Prometheus metrics are served on this port, 0 serves no metrics
+METRICS_PORT = int(os.environ.get("DQC_METRICS_PORT", 8000))
+metrics.register_caches(results=RESULT_CACHE, render=RENDER_CACHE)
+
+# The sections ask this graph for the quantities they show, each is computed once per version of its inputs
+REPORT_GRAPH = report.build_graph(
+    workers=PROFILE_WORKERS,
+    executor=PROFILE_EXECUTOR,
+    approximate_rows=APPROXIMATE_DISTINCT_ROWS,
+    error=DISTINCT_ERROR,
+    cache=RESULT_CACHE,
+    timer=metrics.time_node,
+    mixed_type_workers=MIXED_TYPE_WORKERS,
+    disk_cache=DISK_CACHE,
+)
+
+
+# The digest of every upload object, computed once however many cached helpers receive the upload
+UPLOAD_DIGESTS = weakref.WeakKeyDictionary()
+
+
+# Caching function for panda dataframes
+# see https://github.com/streamlit/streamlit/issues/1180
+# the upload is hashed block by block instead of copying it with getvalue()
+def hash_io(input_io):
+    """
+    :param input_io: the file selected by the user or a path
+    :return: the content digest, for upload objects it is computed once and then looked up
+    """
+    try:
+        return UPLOAD_DIGESTS[input_io]
+    except (KeyError, TypeError):
+        # TypeError: paths cannot be weakly referenced, their file may change between reruns
+        pass
+    digest = disk_cache.content_digest(input_io)
+    try:
+        UPLOAD_DIGESTS[input_io] = digest
+    except TypeError:
+        pass
+    return digest
+
 
-def load_file(filename, delim):
+# Uploads are keyed on the digest of their content
+UPLOAD_HASH_FUNCS = {io.BytesIO: hash_io, io.StringIO: hash_io}
+
+
+@RESULT_CACHE.memoize(hash_funcs=UPLOAD_HASH_FUNCS)
+def get_file_format(filename, delim=None):
     """
+    Detect the format of the file from its first bytes
     :param filename: a filename selected by the user using the uploader widget, see main.py
-    :return: df: a dataframe with the loaded data
+    :param delim: the delimiter chosen by the user, None detects the delimiter of a csv file
+    :return: a FileFormat with the kind of file and the options to parse a csv file
     """
+    return sniff.sniff(filename, delim)
 
-    # Caching function for panda dataframes
-    # see https://github.com/streamlit/streamlit/issues/1180
 
-    def hash_io(input_io):
-        return input_io.getvalue(), input_io.tell()
+def load_file(filename, delim, columns=None, sheet=None):
+    """
+    :param filename: a filename selected by the user using the uploader widget, see main.py
+    :param delim: the delimiter chosen by the user, None detects the delimiter of a csv file
+    :param columns: the columns to load from a parquet or arrow file, None loads all columns
+    :param sheet: the sheet to load from an excel file, None loads the first sheet
+    :return: a DatasetHandle with the loaded data, its token identifies the file and the options
+    """
 
-    # Function decorator to improve speed of the app using caching
-    @st.cache(
-        hash_funcs={io.BytesIO: hash_io, io.StringIO: hash_io},
-        allow_output_mutation=True,
-        show_spinner=False,
-        suppress_st_warning=True,
-    )
-    # Function that tries to read file as a csv
-    # if selected file is not a csv file then it will load as an excel file
-    def try_read_df(filename, delim):
+    # Function decorator to improve speed of the app using caching, see RESULT_CACHE
+    @RESULT_CACHE.memoize(hash_funcs=UPLOAD_HASH_FUNCS)
+    # Function that reads the file with the reader that matches its detected format,
+    # so the file is parsed only once
+    def try_read_df(filename, delim, columns, sheet):
         """
         :param filename: the file that is selected by the user
         :param delim: the delimiter chosen by the user
-        :return: a pandas dataframe
+        :param columns: the columns to load from a parquet or arrow file
+        :param sheet: the sheet to load from an excel file
+        :return: a DatasetHandle
         """
-
         try:
-            return pd.read_csv(filename, sep=delim)
-        except (TypeError, ParserError):
+            return read_dataset(filename, delim, columns, sheet)
+        except (TypeError, ParserError, UnicodeDecodeError):
             st.error("**Please change your delimiter in the sidebar.**")
-        except Exception:
-            return pd.read_excel(filename)
 
     # if a filename is found, then read it using the function above
     if filename is not None:
-        # df = try_read_df(filename)
-        df = try_read_df(filename, delim)
-        if len(df) != 0:
+        handle = try_read_df(filename, delim, columns, sheet)
+        if handle is not None and len(handle) != 0:
             st.sidebar.success(":thumbsup: **The file has been loaded.**")
-            return df
+            return handle
         else:
             st.error("**Please change your delimiter in the sidebar.**")
 
 
+def read_dataset(filename, delim=None, columns=None, sheet=None):
+    """
+    Read a file with the reader that matches its detected format
+    :param filename: a path or the file selected by the user
+    :return: a DatasetHandle, its token is the digest of the file combined with the options it is read with
+    """
+    file_format = get_file_format(filename, delim)
+
+    # parquet and arrow files are read directly, only the selected columns are loaded
+    if file_format.is_columnar:
+        token = disk_cache.cache_key(hash_io(filename), file_format, columns=columns)
+        with metrics.PARSE_SECONDS.labels(file_format.kind).time():
+            df = readers.read_columnar(filename, file_format.kind, columns)
+        metrics.observe_load(file_format.kind, filename, df)
+        return DatasetHandle(df, token)
+
+    def parse():
+        with metrics.PARSE_SECONDS.labels(file_format.kind).time():
+            return readers.read_file(filename, file_format, sheet=sheet)
+
+    # csv files and excel sheets are parsed once, after that they are memory-mapped from the disk cache
+    key = disk_cache.cache_key(hash_io(filename), file_format, sheet=sheet)
+    df = DISK_CACHE.get_or_load(key, parse)
+    metrics.observe_load(file_format.kind, filename, df)
+    return DatasetHandle(df, key)
+
+
+@RESULT_CACHE.memoize
+def load_sample_file(path="titanic.xlsx"):
+    """
+    :param path: the dataset that is shown when no file is uploaded
+    :return: a DatasetHandle, the workbook is converted once and then read from the disk cache
+    """
+    return read_dataset(path)
+
+
+@RESULT_CACHE.memoize(hash_funcs=UPLOAD_HASH_FUNCS)
+def get_sheet_names(filename):
+    """
+    :param filename: a filename selected by the user using the uploader widget, see main.py
+    :return: the sheet names of an excel file from its metadata, None for other files
+    """
+    if get_file_format(filename).kind != "excel":
+        return None
+    return excel.sheet_names(filename)
+
+
+@RESULT_CACHE.memoize(hash_funcs=UPLOAD_HASH_FUNCS)
+def get_file_columns(filename):
+    """
+    :param filename: a filename selected by the user using the uploader widget, see main.py
+    :return: the column names of a parquet or arrow file from its metadata, None for other files
+    """
+    file_format = get_file_format(filename)
+    if not file_format.is_columnar:
+        return None
+    return readers.read_columns(filename, file_format.kind)
+
+
+def load_spilled(filename, delim, chunksize=readers.CHUNK_SIZE, sheet=None):
+    """
+    Out-of-core alternative to load_file for csv and excel files that are larger than memory
+    :param filename: a filename selected by the user using the uploader widget, see main.py
+    :param delim: the delimiter chosen by the user, None detects the delimiter
+    :param chunksize: the number of rows that is read at once, this bounds the memory usage
+    :param sheet: the sheet to read from an excel file, None reads the first sheet
+    :return: the file converted to disk chunk by chunk, see Engine/spill.py
+    """
+
+    # not cached in memory: the directory may be evicted from the disk cache, then it is converted again
+    def try_spill_chunks(filename, delim, chunksize, sheet):
+        try:
+            file_format = get_file_format(filename, delim)
+            # the conversion of a file is reused, also after a restart, like the disk cache of load_file
+            key = disk_cache.cache_key(hash_io(filename), file_format, sheet=sheet, chunksize=chunksize)
+            directory = DISK_CACHE.path(key, ".spill")
+            try:
+                return spill.SpilledFrame.open(directory)
+            except (OSError, ValueError):
+                pass
+            with metrics.PARSE_SECONDS.labels(file_format.kind + "_spill").time():
+                spilled = spill.SpilledFrame.from_chunks(
+                    readers.iter_chunks(filename, file_format, chunksize, sheet), directory
+                )
+            DISK_CACHE.evict(keep=[directory])
+            return spilled
+        except (TypeError, ParserError, UnicodeDecodeError):
+            st.error("**Please change your delimiter in the sidebar.**")
+            return None
+
+    if filename is not None:
+        spilled = try_spill_chunks(filename, delim, chunksize, sheet)
+        if spilled is not None and len(spilled) != 0:
+            st.sidebar.success(":thumbsup: **The file has been converted.**")
+            return spilled
+        else:
+            st.error("**Please change your delimiter in the sidebar.**")
+    return None
+
+
+# The helpers below read a spilled file, the cache keys them on its directory
+@RESULT_CACHE.memoize(hash_funcs=spill.HASH_FUNCS)
+def get_spilled_profile(spilled):
+    """
+    :return: the profile of the full file, computed one column at a time
+    """
+    return spill.profile_spilled(spilled, error=DISTINCT_ERROR)
+
+
+@RESULT_CACHE.memoize(hash_funcs=spill.HASH_FUNCS)
+def get_spilled_duplicates(spilled, columns):
+    """
+    :param columns: a tuple with the columns that are compared
+    :return: the DuplicateSummary and at most MAX_SPILLED_DUPLICATES duplicate rows
+    """
+    return spill.find_duplicates(spilled, list(columns), max_rows=MAX_SPILLED_DUPLICATES)
+
+
+@RESULT_CACHE.memoize(hash_funcs=spill.HASH_FUNCS)
+def get_spilled_mixed_types(spilled):
+    return spill.find_mixed_types(spilled, get_spilled_profile(spilled))
+
+
+# The helpers below take a DatasetHandle, the cache keys them on its token instead of hashing the dataframe
+@RESULT_CACHE.memoize(hash_funcs=HASH_FUNCS)
+def get_optimised_df(handle):
+    """
+    Downcast numerical columns, encode string columns with few distinct values as category
+    and store other string columns as Arrow strings where pandas supports it
+    :return: a handle of the optimised dataframe and a report with the memory usage before and after
+    """
+    df, report = optimise_dtypes(handle.frame)
+    return handle.derive(df, "optimise_dtypes"), report
+
+
+def get_report(handle):
+    """
+    :param handle: the DatasetHandle of the loaded data, its token is the version of the data
+    :return: the report graph evaluated on all rows of the dataframe, see Engine/report.py
+    """
+    return REPORT_GRAPH.bind(
+        data=(handle.frame, handle.token), rows=(None, None), token=(handle.token, handle.token)
+    )
+
+
+# The helpers below read the nodes of the report graph, so there is one computation path for the statistics
+def get_profile(handle):
+    """
+    :return: the DatasetProfile of all rows, the other helpers read their unique, missing and zero values from it
+    """
+    return get_report(handle).get("profile")
+
+
+def get_column_kinds(handle):
+    """
+    Classify the columns by their number of unique values
+    Only counts as many unique values as the classification needs, see Engine/cardinality.py
+    """
+    return get_report(handle).get("kinds")
+
+
 # Function that creates a list of all column names, just the numerical names and categorical names
-@st.cache
-def get_float_names(df):
+def get_float_names(handle):
     """
-    Look for columns of type float
+    Look for columns of type float, of any size
     Return as list
     """
-    df_float = df.loc[:, df.dtypes == "float64"]
-    float_names = df_float.columns.tolist()
-    return float_names
+    return get_report(handle).get("float_names")
 
 
-@st.cache
-def get_predictor_names(df):
+def get_predictor_names(handle):
     """
     Look for columns that contain two unique values
     Return as list
     """
-    # Check the number of unique values per column
-    unique_values = df.apply(pd.Series.nunique).to_frame("Unique Values").iloc[:, 0]
-    df_predictors = df.loc[:, unique_values == 2]
-
-    # convert these names to a list
-    predictor_names = df_predictors.columns.tolist()
-    return predictor_names
+    return get_column_kinds(handle).predictor_names()
 
 
-@st.cache(show_spinner=False)
-def get_int_names(df):
+def get_int_names(handle):
     """
-    Look for columns of type int
+    Look for columns of type int, of any size
     Return as list
     """
-    df_int = df.loc[:, df.dtypes == "int64"]
-    int_names = df_int.columns.tolist()
-    return int_names
+    return get_report(handle).get("int_names")
 
 
-def get_numerical_names(df):
+def get_numerical_names(handle):
     """
     Look for columns of type int, with more than 10 unique values
     Also look for float columns
     Remove names that are a unique identifier
     """
-    # Only the numerical columns
-    df_int = df.loc[:, df.dtypes == "int64"]
-
-    # the integers need to have more than 10 distinct values to be considered a numerical value
-    unique_values = df_int.apply(pd.Series.nunique).to_frame("Unique Values").iloc[:, 0]
-    df_int = df_int.loc[:, unique_values > 10]
-    int_names = df_int.columns.tolist()
+    return get_report(handle).get("numerical_names")
 
-    df_float = df.loc[:, df.dtypes == "float64"]
-    float_names = df_float.columns.tolist()
-    num_names = int_names + float_names
-    # remove identifiers
-    id_names = get_id_names(df)
-    num_names = [x for x in num_names if x not in id_names]
-    num_names
-    return num_names
 
-
-@st.cache(show_spinner=False)
-def get_categorical_names(df):
+def get_categorical_names(handle):
     """
     Return column names of columns with less than 10 unique values
+    The data is not changed, the frame node of the report stores these columns as category
     """
-    # Check the number of unique values per column
-    unique_values = df.apply(pd.Series.nunique).to_frame("Unique Values").iloc[:, 0]
-
-    # If the number is lower than 5, I classify it as a categorical variable, this is subjective.
-    df_factors = df.loc[:, unique_values < 10]
-
-    # Ensure that these are of type: object
-    for col in df_factors:
-        df[col] = df[col].astype("object")
-
-    # convert these names to a list
-    factor_names = df_factors.columns.tolist()
-    return factor_names
+    return get_report(handle).get("categorical_names")
 
 
 #
-@st.cache(show_spinner=False)
-def get_text_names(df):
+def get_text_names(handle):
     """
     If the ratio of unique values in object columns is higher than 0.1,
     return as text columns --> in a list)
     """
-    unique_values = df.apply(pd.Series.nunique).to_frame("Unique Values").iloc[:, 0]
-    df_obj = df.loc[:, df.dtypes == "object"]
-    nr_rows = df.shape[0]
     # if more than 10% of the data is unique the column is marked as a potential text feature.
-    df_text = df_obj.loc[:, unique_values / nr_rows >= 0.10]
-    return df_text.columns.tolist()
+    return get_column_kinds(handle).text_names()
 
 
-@st.cache(show_spinner=False)
-def get_id_names(df):
+def get_id_names(handle):
     """
     Return column names that use have unique values
     Remove floats
     """
-    nr_rows = df.shape[0]
-    unique_values = df.apply(pd.Series.nunique).to_frame("Unique Values").iloc[:, 0]
-    id_frame = df.loc[:, unique_values == nr_rows]
-    id_names = id_frame.columns.tolist()
-    float_names = get_float_names(df)
-    id_names = [x for x in id_names if x not in float_names]
-    return id_names
+    return get_column_kinds(handle).id_names()
 
 
-@st.cache(show_spinner=False)
-def get_all_names(df):
+def get_all_names(handle):
     """
     :return: all the column names
     """
-    all_names = df.columns.tolist()
-    return all_names
+    return get_report(handle).get("all_names")
 
 
-@st.cache(show_spinner=False)
+@RESULT_CACHE.memoize
 def highlight_missing(c):
     """
     Highlight the cells with missing value more than 10%
@@ -181,129 +384,69 @@ def highlight_missing(c):
     return ["background-color: #FFD5D5" if v else "" for v in missing]
 
 
-@st.cache(show_spinner=False)
 def is_data_missing(df, percent_missing):
     """
-    :param df: original dataframe
+    :param df: original dataframe, the missing columns follow from percent_missing so it is not read again
     :param percent_missing: df with percentage of missing values for each variable
     :return: list of columns that are still missing, list of messages to return to the user, and the type
     of message that is return to the user
     """
+    return get_missing_verdicts(percent_missing)
 
-    still_missing = df.columns[df.isna().any()].tolist()
-
-    message = []
-    type = []
-    drop_columns = []
-    impute_columns = []
-    for index, row in percent_missing.iterrows():
-        if row[0] >= 10:
-            drop_columns.append(index)
-        elif 0.000 < row[0] < 10.000:
-            impute_columns.append(index)
-    if drop_columns is not None:
-        drop_string = ", ".join(drop_columns)
-        if len(drop_columns) > 1:
-            message.append(
-                ":warning: The columns **{}** contain more than 10% of missing values, you should consider "
-                "**dropping** these "
-                "columns if the columns do not contain valuable information.".format(
-                    drop_string
-                )
-            )
-            type.append("drop")
-        elif len(drop_columns) == 1:
-            message.append(
-                ":warning: **{}** contains more than 10% of missing values, you should consider **dropping** this "
-                "column if the column does not contain valuable information.".format(
-                    drop_string
-                )
-            )
-            type.append("drop")
-    if impute_columns is not None:
-        impute_string = ", ".join(impute_columns)
-        if len(impute_columns) > 1:
-            message.append(
-                "**{}** contain between 0 and 10% of missing values, you should "
-                "consider **imputing** the values.".format(impute_string)
-            )
-        elif len(impute_columns) == 1:
-            message.append(
-                ":construction: **{}** contains between 0 and 10% of missing values, you should "
-                "consider **imputing** the values for this column.".format(
-                    impute_string
-                )
-            )
-        type.append("impute")
 
-    if len(still_missing) == 0:
-        message = ":heavy_check_mark: There are no missing values in your data."
-    # message_missing = "Your original data contains missing values, imputation is necessary."
-    # not_missing = "Your data does not contain any missing values. No imputation is necessary."
-    # is_missing = message_missing if len(still_missing) != 0 else not_missing
-    return still_missing, message, type
+@RESULT_CACHE.memoize
+def get_missing_verdicts(percent_missing):
+    """
+    The verdicts of is_data_missing, cached on the percentages only
+    """
+    return checks.missing_verdicts(percent_missing)
 
 
-@st.cache(show_spinner=False)
-def get_head_df(df, choice_size):
+@RESULT_CACHE.memoize(hash_funcs=HASH_FUNCS)
+def get_head_df(handle, choice_size):
     """
     :param choice_size: A parameter that the user determines
     Returns either the full dataset or the first 100 rows
     """
     if choice_size == "Full":
-        head_df = df
+        head_df = handle.frame
     elif choice_size == "First 100":
-        head_df = df.head(100)
+        head_df = handle.frame.head(100)
     return head_df
 
 
-@st.cache(show_spinner=False)
-def get_unique_values(df):
+def get_unique_values(handle):
     """
     show number of unique values for each variable
     """
-    unique_values = df.apply(pd.Series.nunique).to_frame("Unique Values").iloc[:, 0]
-    return unique_values
+    return get_profile(handle).unique_values()
 
 
-@st.cache(show_spinner=False)
-def get_type_variables(df):
+def get_type_variables(handle):
     """
     Gets the type of each variable in the df
     """
-    data_types = df.dtypes.to_frame("Variable Type")
-    return data_types
+    return get_profile(handle).data_types()
 
 
-@st.cache(show_spinner=False)
-def get_zero_values(df):
+def get_zero_values(handle):
     """
     Gets the number of values with 0
     """
-    zero_values = df.isin([0]).sum()
-    zero_values = zero_values.to_frame()
-    zero_values.columns = ["Zero Values"]
-    return zero_values
+    return get_profile(handle).zero_values()
 
 
-@st.cache(show_spinner=False)
-def get_missings(df):
+def get_missings(handle):
     """
     Gets the percentage and absolute number of missing vlaues
     """
-    # get number of missing values for each variable
-    missing_values = df.isnull().sum().to_frame("Missing Values").iloc[:, 0]
-
-    # compute percentage of missing values
-    percent_missing = (missing_values * 100 / len(df)).to_frame("Percent Missing")
+    profile = get_profile(handle)
+    return profile.missing_values(), get_report(handle).get("percent_missing")
 
-    return missing_values, percent_missing
 
-
-@st.cache(show_spinner=False)
-def get_missing_values(df):
+def get_missing_values(handle):
     """
-    :param df:
+    :param handle: the DatasetHandle of the data
     :return:
 
     - df with number of missing values per variable
@@ -313,7 +456,7 @@ def get_missing_values(df):
     """
 
     # get number of missing values for each variable
-    missing_values = df.isnull().sum().to_frame("Missing Values").iloc[:, 0]
+    missing_values = get_profile(handle).missing_values()
 
     # reset the index
     missing_values_df = missing_values.reset_index()
@@ -328,67 +471,42 @@ def get_missing_values(df):
     missing_values_names = only_missings_df["Variable"].tolist()
 
     # compute percentage of missing values
-    percent_missing = (missing_values * 100 / len(df)).to_frame("Percent Missing")
+    percent_missing = get_report(handle).get("percent_missing")
 
     return missing_values, only_missings_df, percent_missing, missing_values_names
 
 
-@st.cache(show_spinner=False)
-def summary_table(df):
+def summary_table(handle):
     """Summary table of the data
-    :param df: the input data
+    :param handle: the DatasetHandle of the input data
     :return: summary statistics table, including the unique values, missing values and data types
     """
 
-    # show number of unique values for each variable
-    unique_values = df.apply(pd.Series.nunique).to_frame("Unique Values").iloc[:, 0]
-
-    # show the number of missing values for each variable
-    missing_values = df.isnull().sum().to_frame("Missing Values").iloc[:, 0]
-    missing_values_df = missing_values.reset_index()
-    only_missings_df = missing_values_df[missing_values_df["Missing Values"] > 0]
-    only_missings_df.columns = ["Variable", "Missing Values"]
-
-    # get the names of the  columns that contain missing values
-    missing_values_names = only_missings_df["Variable"].tolist()
-
-    # compute percentage of missing values
-    percent_missing = (missing_values * 100 / len(df)).to_frame("Percent Missing")
-
-    # the type for each variable
-    data_types = df.dtypes.to_frame("Variable Type")
+    missing_values, only_missings_df, percent_missing, missing_values_names = get_missing_values(handle)
 
-    # merge the different values
-    table = pd.concat(
-        [unique_values, missing_values, percent_missing, data_types], axis=1
+    # the summary_table node has the unique, missing and zero values and the type for each variable
+    table = get_report(handle).get("summary_table")
+    table = table[["Unique Values", "Missing Values", "Percent Missing", "Variable Type"]].assign(
+        **{"0 values": table["Zero Values"]}
     )
-    zero_values = df.isin([0]).sum()
-    table["0 values"] = zero_values
     table = table.round(2)
     return table, missing_values_names, only_missings_df, percent_missing
 
 
-@st.cache(show_spinner=False)
-def number_rows_columns(df):
+def number_rows_columns(handle):
     """
-    :param df:
+    :param handle: the DatasetHandle of the data
     :return: number of rows and columns of dataframe
     """
-    number_rows = df.shape[0]
-    number_columns = df.shape[1]
-    return number_rows, number_columns
+    profile = get_profile(handle)
+    return profile.n_rows, len(profile.columns)
 
 
-@st.cache(show_spinner=False)
-def describe_table(df):
+def describe_table(handle):
     """
     Get statistics on numerical data
     """
-
-    data_characteristics = df.describe().loc[
-        ["mean", "std", "min", "25%", "50%", "75%", "max"]
-    ]
-    return data_characteristics
+    return get_report(handle).get("describe")
 
 
 def innersection_space():
@@ -436,10 +554,11 @@ def days_between(d1, d2):
         d2 = datetime.strptime(d2, "%m-%d-%Y")
     return abs((d2 - d1).days)
 
-def all_cards(df):
+def all_cards(profile):
     """
     Create cards for df length, columns and missing values
     and align them side by side
+    :param profile: the DatasetProfile of the data, see the profile node of Engine/report.py
     """
     pass
     st.markdown(
@@ -448,19 +567,19 @@ def all_cards(df):
                 <div class="card text-white bg-info">
                     <div class="card-body">
                         <h4 class="card-title">Number of Rows</h4>
-                        <p class="card-text">{len(df):,d}</p>
+                        <p class="card-text">{profile.n_rows:,d}</p>
                     </div>
                 </div>
                 <div class="card text-white bg-success">
                       <div class="card-body">
                         <h4 class="card-title">Number of Columns</h4>
-                        <p class="card-text">{len(df.columns):,d}</p>
+                        <p class="card-text">{profile.n_columns:,d}</p>
                       </div>
                 </div>
                 <div class="card text-white bg-danger">
                       <div class="card-body">
                         <h4 class="card-title">Total Missing Values</h4>
-                        <p class="card-text">{df.isnull().values.ravel().sum():,d}</p>
+                        <p class="card-text">{profile.total_missing:,d}</p>
                       </div>
                 </div>
             </div>
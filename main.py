@@ -1,11 +1,12 @@
 import streamlit as st
-import pandas as pd
 
 # import functions from external python scripts
 from Text import text_markdown
 
 # helper functions
 import helpers
+from Engine import metrics
+from Engine.spill import SpillEvictedError
 
 # The different sections
 from Sections import eda
@@ -15,6 +16,9 @@ from Sections import preprocessing
 def main():
     st.set_option('deprecation.showfileUploaderEncoding', False)
 
+    # the metrics of the load, profile and render times, see Engine/metrics.py
+    metrics.serve(helpers.METRICS_PORT)
+
     def _max_width_():
         max_width_str = f"max-width: 1000px;"
         st.markdown(
@@ -47,32 +51,94 @@ def main():
     # show the intro page
     text_markdown.intro_page()
 
-    # load the data, currently allows for csv and excel imports
+    # load the data, currently allows for csv, excel, parquet and arrow (feather) imports
     st.sidebar.title(":floppy_disk: Upload Your File")
-    filename = st.sidebar.file_uploader("Choose a file", type=["xlsx", "csv"])
+    filename = st.sidebar.file_uploader(
+        "Choose a file", type=["xlsx", "csv", "parquet", "feather", "arrow"]
+    )
 
+    # the delimiter of a csv file is detected automatically unless the user picks one
     delim = st.sidebar.selectbox(
-        "In case of a CSV file, pick the delimiter.", [",", ";", "|"]
+        "In case of a CSV file, pick the delimiter.",
+        ["Detect automatically", ",", ";", "|"],
+    )
+    if delim == "Detect automatically":
+        delim = None
+
+    # excel files with several sheets let the user pick a sheet, the names come from the workbook metadata
+    sheet = None
+    sheet_names = helpers.get_sheet_names(filename) if filename else None
+    if sheet_names is not None and len(sheet_names) > 1:
+        sheet = st.sidebar.selectbox("Pick the sheet to load", sheet_names)
+
+    # large csv and excel files are converted to disk in chunks and checked without loading them in memory
+    spill = st.sidebar.checkbox(
+        "Check a large CSV or Excel file on disk, one column at a time (no filters or visualizations)"
     )
 
+    if filename and spill and helpers.get_file_format(filename, delim).kind in ("csv", "excel"):
+        spilled = helpers.load_spilled(filename, delim, sheet=sheet)
+
+        helpers.betweensection_space()
+        helpers.sidebar_space()
+
+        if spilled is not None:
+            try:
+                eda.first_inspection_spilled(helpers.get_spilled_profile(spilled), spilled.head())
+                preprocessing.preprocess_spilled(spilled)
+            except SpillEvictedError:
+                st.error("**The converted file was removed from the disk cache, please reload the page.**")
+
+        st.markdown("---")
+        return
+
     if filename:
 
-        df = helpers.load_file(filename, delim)
+        # parquet and arrow files only load the selected columns
+        all_columns = helpers.get_file_columns(filename)
+        columns = None
+        if all_columns is not None:
+            columns = st.sidebar.multiselect(
+                "Select the columns to load", all_columns, all_columns
+            )
+
+        # the handle carries a token of the file and options, the caches key on it instead of the data
+        handle = helpers.load_file(filename, delim, columns, sheet)
 
     else:
-        df = pd.read_excel("titanic.xlsx")
+        handle = helpers.load_sample_file("titanic.xlsx")
+
+    if handle is not None and st.sidebar.checkbox(
+        "Optimise memory usage (smaller number types, categories for repeated text)"
+    ):
+        handle, memory_report = helpers.get_optimised_df(handle)
+        st.sidebar.info(
+            ":floppy_disk: Memory usage went from **{:,.1f} MB** to **{:,.1f} MB**.".format(
+                memory_report.memory_before / 1e6, memory_report.memory_after / 1e6
+            )
+        )
+
+    # only the sections that are shown compute their statistics and figures
+    sections = ["First Inspection", "Visualizations", "Additional Information"]
+    shown = st.sidebar.multiselect("Sections to show", sections, sections)
 
     # space between sections
     helpers.betweensection_space()
     helpers.sidebar_space()
 
-
-    # Ensures navigation between pages
-    df = eda.first_inspection(df)
-    eda.visuals(df)
+    # the filters of the first inspection apply to the other sections as well
+    report = helpers.get_report(handle)
+    if "First Inspection" in shown:
+        with metrics.time_section("first_inspection"):
+            report = eda.first_inspection(report)
+    if "Visualizations" in shown:
+        with metrics.time_section("visuals"):
+            eda.visuals(report)
     helpers.betweensection_space()
     helpers.sidebar_space()
-    preprocessing.preprocess(df)
+    if "Additional Information" in shown:
+        with metrics.time_section("preprocess"):
+            preprocessing.preprocess(report)
 
     # bottom line and github logo
     st.markdown("---")
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from Engine.accumulators import DatasetAccumulator, profile_chunks
+from Engine.profile import DatasetProfile
+
+
+def frame(n_rows=5000):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(
+        {
+            "int": rng.randint(0, 100, n_rows),
+            "float": rng.normal(10, 3, n_rows).round(1),
+            "text": rng.choice(["a", "b", "c", "d"], n_rows),
+            "zeros": rng.randint(0, 3, n_rows),
+        }
+    )
+    df.loc[rng.rand(n_rows) < 0.1, "float"] = np.nan
+    df.loc[rng.rand(n_rows) < 0.1, "text"] = None
+    return df
+
+
+def chunks(df, size):
+    return [df.iloc[start : start + size] for start in range(0, len(df), size)]
+
+
+def test_chunked_profile_equals_the_exact_profile():
+    df = frame()
+    profile, preview = profile_chunks(chunks(df, 700))
+    expected = DatasetProfile.from_frame(df)
+    assert profile.n_rows == expected.n_rows
+    assert preview.equals(df.head(100))
+    pd.testing.assert_frame_equal(profile.summary_table(), expected.summary_table())
+    # mean, std, min and max are exact, the quartiles are exact below max_exact distinct values
+    pd.testing.assert_frame_equal(profile.describe(), expected.describe())
+
+
+def test_merged_accumulators_equal_one_accumulator():
+    df = frame()
+    parts = chunks(df, 1234)
+    merged = DatasetAccumulator()
+    for part in parts:
+        merged.merge(DatasetAccumulator().update(part))
+    single = DatasetAccumulator().update(df)
+    pd.testing.assert_frame_equal(merged.to_profile().summary_table(), single.to_profile().summary_table())
+    pd.testing.assert_frame_equal(merged.to_profile().describe(), single.to_profile().describe())
+
+
+def test_int_and_float_chunks_of_one_column():
+    # a column that is parsed as integers in one chunk and as floats with missing values in another
+    first = pd.DataFrame({"a": np.array([1, 2, 3], dtype="int64")})
+    second = pd.DataFrame({"a": [2.0, 3.0, np.nan, 4.0]})
+    column = DatasetAccumulator().update(first).update(second).to_profile()["a"]
+    assert column.n_unique == 4
+    assert column.n_missing == 1
+
+
+def test_estimated_unique_values():
+    df = pd.DataFrame({"id": np.arange(50_000)})
+    column = DatasetAccumulator(max_exact=256, error=0.02).update(df).to_profile()["id"]
+    assert not column.n_unique_exact
+    assert abs(column.n_unique - 50_000) <= 0.1 * 50_000
+    assert column.n_unique <= 50_000
+
+
+def test_columns_that_differ_between_chunks():
+    # "late" only occurs from the second chunk on, "early" only in the first
+    parts = [
+        pd.DataFrame({"a": [1.0, 2.0], "early": ["x", "y"]}),
+        pd.DataFrame({"a": [3.0, 4.0, 5.0], "late": [1.0, np.nan, 2.0]}),
+        pd.DataFrame({"a": [6.0], "late": [3.0]}),
+    ]
+    expected = DatasetProfile.from_frame(pd.concat(parts, ignore_index=True))
+    chunked = DatasetAccumulator()
+    merged = DatasetAccumulator()
+    for part in parts:
+        chunked.update(part)
+        merged.merge(DatasetAccumulator().update(part))
+    for accumulator in (chunked, merged):
+        profile = accumulator.to_profile()
+        assert profile["late"].n_rows == profile["early"].n_rows == 6
+        pd.testing.assert_series_equal(profile.missing_values(), expected.missing_values())
+        pd.testing.assert_series_equal(profile.unique_values(), expected.unique_values())
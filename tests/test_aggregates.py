@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from Engine import aggregates
+
+
+def test_density_uses_scotts_bandwidth():
+    values = np.random.RandomState(0).normal(size=500)
+    grid, density = aggregates._density(values)
+    bandwidth = values.std(ddof=1) * len(values) ** (-1 / 5)
+    kernels = np.exp(-0.5 * ((grid[:, None] - values[None, :]) / bandwidth) ** 2)
+    exact = kernels.sum(axis=1) / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    assert np.abs(density - exact).max() < 0.01 * exact.max()
+
+
+def test_box_stats_keep_empty_groups():
+    values = pd.Series([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    groups = pd.Series(pd.Categorical(list("aaaccc"), categories=list("abc")))
+    stats = aggregates.box_stats(values, groups)
+    assert [box["label"] for box in stats] == ["a", "b", "c"]
+    assert [box["n"] for box in stats] == [3, 0, 3]
+    assert stats[2]["med"] == 5.0
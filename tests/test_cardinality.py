@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from Engine.cardinality import ColumnKinds, all_unique, count_distinct_upto
+
+
+def test_large_int64_ids_are_identifiers():
+    ids = pd.Series(2 ** 53 + np.arange(5000, dtype="int64"), name="id")
+    assert all_unique(ids)
+    assert ColumnKinds.from_frame(ids.to_frame()).id_names() == ["id"]
+
+
+def test_large_int64_distinct_count():
+    values = pd.Series(2 ** 62 + np.arange(8, dtype="int64"))
+    assert count_distinct_upto(values, 10) == 8
+
+
+def test_count_distinct_stops_above_limit():
+    assert count_distinct_upto(pd.Series(np.arange(100_000)), 10) == 11
+    assert count_distinct_upto(pd.Series([1.0, np.nan, 1.0, 2.0]), 10) == 2
+
+
+def test_classification():
+    df = pd.DataFrame(
+        {
+            "flag": [0, 1] * 50,
+            "level": ["a", "b", "c", "d"] * 25,
+            "amount": np.linspace(0, 1, 100),
+            "count": np.arange(100) % 20,
+        }
+    )
+    kinds = ColumnKinds.from_frame(df)
+    assert kinds.predictor_names() == ["flag"]
+    assert kinds.categorical_names() == ["flag", "level"]
+    assert kinds.numerical_names() == ["count", "amount"]
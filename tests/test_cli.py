@@ -0,0 +1,24 @@
+import json
+import os
+
+from Engine import cli
+
+
+def test_report_names_keep_directories_apart():
+    names = cli.report_names([os.path.join("in", "a", "data.csv"), os.path.join("in", "b", "data.csv")])
+    assert sorted(names.values()) == [os.path.join("a", "data.csv.json"), os.path.join("b", "data.csv.json")]
+
+
+def test_report_name_of_a_single_file():
+    assert cli.report_names([os.path.join("in", "data.csv")]) == {os.path.join("in", "data.csv"): "data.csv.json"}
+
+
+def test_profile_files_with_the_same_name(tmp_path):
+    for directory, value in (("a", 1), ("b", 2)):
+        os.makedirs(str(tmp_path / "in" / directory))
+        (tmp_path / "in" / directory / "data.csv").write_text("x,y\n{},text\n".format(value))
+    output_dir = tmp_path / "out"
+    assert cli.main(["profile", str(tmp_path / "in"), "--workers", "1", "--output-dir", str(output_dir)]) == 0
+    for directory in ("a", "b"):
+        with open(str(output_dir / directory / "data.csv.json")) as file:
+            assert json.load(file)["path"].endswith(os.path.join(directory, "data.csv"))
@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from Engine.disk_cache import DiskCache, disk_usage
+
+
+def frame(value):
+    return pd.DataFrame({"a": np.full(1000, value, dtype="int64")})
+
+
+def test_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    cache.put("key", frame(1))
+    assert "key" in cache
+    assert cache.get("key")["a"].tolist() == [1] * 1000
+    assert cache.get("other") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    for age, key in enumerate(["new", "used", "old"]):
+        cache.put(key, frame(age))
+        os.utime(cache.path(key), (1000 - age, 1000 - age))
+    cache.get("used")
+
+    cache.max_bytes = disk_usage(cache.path("new")) * 2
+    cache.put("newest", frame(3))
+    assert "old" not in cache and "new" not in cache
+    assert "used" in cache and "newest" in cache
+
+
+def test_new_entry_is_kept_over_the_budget(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1)
+    cache.put("key", frame(1))
+    assert "key" in cache
+
+
+def test_stale_temporaries_are_removed(tmp_path):
+    temporary = tmp_path / "unfinished.tmp"
+    temporary.write_bytes(b"x")
+    os.utime(str(temporary), (0, 0))
+    DiskCache(str(tmp_path), max_bytes=1).put("key", frame(1))
+    assert not temporary.exists()
+
+
+def test_miss_and_hit_return_the_same_frame(tmp_path):
+    df = pd.DataFrame(
+        {
+            "level": pd.Categorical(["a", "b", "a"]),
+            # Arrow stores integers with a missing value as int64, they come back as float64
+            "count": pd.Series([1, None, 3], dtype="object"),
+            "text": ["x", None, "z"],
+            "when": pd.to_datetime(["2020-01-01", None, "2020-01-03"]),
+            "amount": [1.5, np.nan, 2.0],
+        }
+    )
+    cache = DiskCache(str(tmp_path))
+    miss = cache.get_or_load("key", lambda: df)
+    hit = cache.get_or_load("key", lambda: None)
+    pd.testing.assert_frame_equal(miss, hit)
+    assert miss["count"].dtype == "float64"
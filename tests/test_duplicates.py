@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from Engine.duplicates import RowHashIndex
+
+
+def test_matches_pandas_duplicated():
+    df = pd.DataFrame({"a": [1, 2, 1, np.nan, np.nan], "b": ["x", "y", "x", None, None]})
+    index = RowHashIndex(df)
+    assert index.duplicated().tolist() == df.duplicated(keep=False).tolist()
+    assert index.duplicated(["b"]).tolist() == df.duplicated(subset=["b"], keep=False).tolist()
+
+
+def test_large_integers_are_distinct():
+    df = pd.DataFrame({"id": np.array([2 ** 53, 2 ** 53 + 1, 2 ** 53 + 2, 2 ** 53 + 3], dtype="int64")})
+    assert RowHashIndex(df).summary().n_rows == 0
+
+
+def test_number_and_string_are_distinct():
+    df = pd.DataFrame({"a": pd.Series([1, "1", 2], dtype="object")})
+    assert RowHashIndex(df).summary().n_rows == 0
+
+
+def test_rows_are_grouped():
+    df = pd.DataFrame({"a": [1, 2, 1, 2, 3]})
+    assert RowHashIndex(df).rows().index.tolist() == [0, 2, 1, 3]
+
+
+def test_hash_collisions_are_not_duplicates():
+    df = pd.DataFrame({"a": [1, 2, 1, 3], "b": ["x", "y", "x", "z"]})
+    index = RowHashIndex(df)
+    # every row gets the same hash, only the values tell the rows apart
+    index._column_hashes = {name: np.zeros(len(df), dtype="uint64") for name in df.columns}
+    assert index.duplicated().tolist() == [True, False, True, False]
+    assert index.summary().n_groups == 1
+    assert index.rows().index.tolist() == [0, 2]
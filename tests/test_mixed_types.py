@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from Engine.mixed_types import find_mixed_types, is_mixed
+
+
+def test_numbers_and_strings_are_mixed():
+    df = pd.DataFrame({"mixed": pd.Series([1, 2, "n/a", 3] * 5, dtype="object"), "text": list("abcd") * 5})
+    [column] = find_mixed_types(df)
+    assert column.name == "mixed"
+    assert column.type_counts == {"int": 15, "str": 5}
+
+
+def test_category_columns_are_checked():
+    series = pd.Series([1, 2, "n/a", 3] * 5, dtype="object").astype("category")
+    assert is_mixed(series)
+    assert [column.name for column in find_mixed_types(series.to_frame("mixed"))] == ["mixed"]
+
+
+def test_unused_categories_are_ignored():
+    series = pd.Series([1, 2, "n/a", 3], dtype="object").astype("category")
+    assert not is_mixed(series.iloc[[0, 1]])
+
+
+def test_mixed_value_outside_the_sample():
+    values = np.arange(5000).astype(object)
+    values[4321] = "x"
+    assert is_mixed(pd.Series(values), sample_size=16)
+
+
+def test_workers_find_the_same_columns_in_order():
+    values = np.arange(5000).astype(object)
+    values[4321] = "x"
+    df = pd.DataFrame({"late": values, "text": ["a"] * 5000, "early": [1, "a"] * 2500, "late_too": values})
+    serial = find_mixed_types(df, sample_size=16)
+    for executor in ("thread", "process"):
+        pooled = find_mixed_types(df, sample_size=16, workers=2, executor=executor)
+        assert [column.name for column in pooled] == ["late", "early", "late_too"]
+        assert [column.type_counts for column in pooled] == [column.type_counts for column in serial]
@@ -0,0 +1,23 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from Engine.disk_cache import DiskCache
+from Engine.parallel import profile_frame
+from Engine.profile import DatasetProfile
+
+
+def test_processes_reuse_the_stored_columns(tmp_path):
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame({"a": rng.randint(0, 100, 2000), "b": rng.choice(list("xyz"), 2000), "c": rng.normal(size=2000)})
+    cache = DiskCache(str(tmp_path))
+    profile_frame(df, workers=2, executor="process", cache=cache, key="data")
+    stored = os.stat(cache.path("data")).st_ino
+
+    rows = np.arange(0, 2000, 3)
+    profile = profile_frame(df, rows=rows, workers=2, executor="process", cache=cache, key="data")
+    assert os.listdir(str(tmp_path)) == ["data.arrow"]
+    # the file is not written again, a new file would have replaced it
+    assert os.stat(cache.path("data")).st_ino == stored
+    pd.testing.assert_frame_equal(profile.summary_table(), DatasetProfile.from_frame(df.iloc[rows]).summary_table())
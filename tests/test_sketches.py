@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from Engine.sketches import NULL_HASH, DistinctCounter, HyperLogLog, QuantileSketch, hash_values
+
+
+def distinct(values):
+    return len(set(hash_values(values).tolist()))
+
+
+def test_large_integers_hash_exactly():
+    values = pd.Series(2 ** 53 + np.arange(4), dtype="int64")
+    assert distinct(values) == 4
+    assert distinct(pd.Series([2 ** 63 - 1, 2 ** 63 - 2], dtype="int64")) == 2
+
+
+def test_numbers_and_strings_hash_differently():
+    assert distinct(pd.Series([1, "1"], dtype="object")) == 2
+    assert distinct(pd.Series([1.5, "1.5", None], dtype="object")) == 3
+
+
+def test_equal_values_hash_equal_across_dtypes():
+    ints = hash_values(pd.Series([1, 2, 3], dtype="int64"))
+    assert (hash_values(pd.Series([1.0, 2.0, 3.0])) == ints).all()
+    assert (hash_values(pd.Series([1, 2, 3], dtype="object")) == ints).all()
+    text = pd.Series(["a", None, "b", "a"])
+    assert (hash_values(text.astype("category")) == hash_values(text)).all()
+
+
+def test_missing_values_hash_equal():
+    hashes = hash_values(pd.Series([None, np.nan, "a"], dtype="object"))
+    assert hashes[0] == hashes[1] == NULL_HASH
+    assert hash_values(pd.Series([np.nan, 1.0]))[0] == NULL_HASH
+
+
+def test_hyperloglog_merge():
+    hashes = hash_values(pd.Series(np.arange(100_000)))
+    left, right = HyperLogLog(0.01), HyperLogLog(0.01)
+    left.add_hashes(hashes[:60_000])
+    right.add_hashes(hashes[40_000:])
+    assert abs(left.merge(right).count() - 100_000) <= 0.05 * 100_000
+
+
+def test_distinct_counter_is_exact_below_max_exact():
+    counter = DistinctCounter(max_exact=1000)
+    counter.add(pd.Series(np.arange(500)))
+    counter.add(pd.Series(np.arange(250, 750)))
+    assert counter.is_exact
+    assert counter.count() == 750
+
+
+def test_quantile_sketch():
+    values = np.random.RandomState(0).normal(size=100_000)
+    sketch = QuantileSketch(max_exact=100)
+    for part in np.array_split(values, 10):
+        other = QuantileSketch(max_exact=100)
+        other.add(np.sort(part))
+        sketch.merge(other)
+    assert not sketch.is_exact
+    assert abs(sketch.quantile(0.5) - np.quantile(values, 0.5)) < 0.05
+
+
+def test_quantile_sketch_is_deterministic():
+    values = np.random.RandomState(1).normal(size=50_000)
+    quantiles = []
+    for _ in range(2):
+        sketch = QuantileSketch(max_exact=100)
+        for part in np.array_split(values, 10):
+            sketch.add(part)
+        quantiles.append([sketch.quantile(q) for q in (0.1, 0.5, 0.9)])
+    assert quantiles[0] == quantiles[1]
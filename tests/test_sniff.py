@@ -0,0 +1,44 @@
+import io
+
+from Engine import readers, sniff
+
+
+def test_sniff_delimiter():
+    file_format = sniff.sniff(io.BytesIO(b"a;b\n1;2\n3;4\n"))
+    assert file_format.kind == "csv"
+    assert file_format.delimiter == ";"
+
+
+def test_all_string_csv_keeps_its_header():
+    source = io.BytesIO(b"name,city\nanna,utrecht\nbob,delft\nbob,delft\n")
+    df = readers.read_csv(source, sniff.sniff(source))
+    assert list(df.columns) == ["name", "city"]
+    assert len(df) == 3
+
+
+def test_numeric_columns_stay_numeric_next_to_text():
+    source = io.BytesIO(b"x,y\n1,a\n2,b\n2,b\n")
+    df = readers.read_csv(source, sniff.sniff(source))
+    assert list(df.columns) == ["x", "y"]
+    assert df["x"].dtype.kind == "i"
+
+
+def test_magic_bytes():
+    assert sniff.sniff(io.BytesIO(b"PAR1....")).kind == "parquet"
+
+
+def test_invalid_byte_after_the_sample_is_replaced():
+    data = b"name,n\n" + "café,1\n".encode("utf-8") * 5000 + b"caf\xe9,2\n"
+    assert len(data) > sniff.SAMPLE_SIZE
+    source = io.BytesIO(data)
+    file_format = sniff.sniff(source)
+    assert file_format.encoding == "utf-8-sig"
+
+    df = readers.read_csv(source, file_format)
+    assert len(df) == 5001
+    assert df["name"].iloc[0] == "café"
+    assert df["name"].iloc[-1] == "caf�"
+
+    chunks = list(readers.iter_csv_chunks(source, file_format, chunksize=1000))
+    assert sum(len(chunk) for chunk in chunks) == 5001
+    assert chunks[-1]["name"].iloc[-1] == "caf�"
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Engine import spill
+from Engine.duplicates import RowHashIndex
+from Engine.profile import DatasetProfile
+
+
+def frame():
+    rng = np.random.RandomState(0)
+    df = pd.DataFrame(
+        {
+            "id": np.arange(1000),
+            "amount": rng.randint(0, 20, 1000).astype(float),
+            "level": rng.choice(["a", "b", "c"], 1000),
+        }
+    )
+    df.loc[::7, "amount"] = np.nan
+    df.iloc[500:510] = df.iloc[0:10].to_numpy()
+    return df
+
+
+def chunks(df, size=300):
+    return (df.iloc[start : start + size] for start in range(0, len(df), size))
+
+
+def test_spill_round_trip(tmp_path):
+    df = frame()
+    spilled = spill.SpilledFrame.from_chunks(chunks(df), str(tmp_path / "data.spill"))
+    assert len(spilled) == len(df) and spilled.n_chunks == 4
+    pd.testing.assert_frame_equal(spilled.take([999, 0, 301]), df.loc[[999, 0, 301]], check_dtype=False)
+    # an existing spill is reused
+    assert spill.SpilledFrame.from_chunks(iter([]), spilled.directory).n_chunks == 4
+
+
+def test_spilled_checks_match_the_checks_in_memory(tmp_path):
+    df = frame()
+    spilled = spill.SpilledFrame.from_chunks(chunks(df), str(tmp_path / "data.spill"))
+    profile = spill.profile_spilled(spilled)
+    expected = DatasetProfile.from_frame(df)
+    pd.testing.assert_series_equal(profile.missing_values(), expected.missing_values())
+    pd.testing.assert_series_equal(profile.unique_values(), expected.unique_values())
+
+    summary, rows = spill.find_duplicates(spilled, ["id", "level"])
+    assert summary == RowHashIndex(df).summary(["id", "level"])
+    assert rows.index.tolist() == RowHashIndex(df).rows(["id", "level"]).index.tolist()
+
+
+def test_interrupted_spill_is_converted_again(tmp_path):
+    directory = tmp_path / "data.spill"
+    directory.mkdir()
+    (directory / "chunk_000000.arrow").write_bytes(b"partial")
+    spilled = spill.SpilledFrame.from_chunks(chunks(frame()), str(directory))
+    assert len(spilled) == 1000
+
+
+def test_estimated_unique_values_do_not_exceed_the_values(tmp_path):
+    df = pd.DataFrame({"id": np.arange(2000)})
+    spilled = spill.SpilledFrame.from_chunks(chunks(df, 500), str(tmp_path / "data.spill"))
+    column = spill.profile_spilled(spilled, max_exact=64, error=0.1)["id"]
+    assert not column.n_unique_exact
+    assert column.n_unique <= 2000
+
+
+def test_evicted_chunk_raises(tmp_path):
+    spilled = spill.SpilledFrame.from_chunks(chunks(frame()), str(tmp_path / "data.spill"))
+    (tmp_path / "data.spill" / "chunk_000001.arrow").unlink()
+    with pytest.raises(spill.SpillEvictedError):
+        spilled.take([400])